@@ -0,0 +1,3333 @@
+#!/usr/bin/env python3
+
+import importlib.util
+import subprocess
+import re
+import sys
+import json
+import sqlite3
+import os
+import time
+from datetime import datetime
+import locale
+import pathlib
+import unicodedata
+from urllib.parse import urlsplit, urljoin
+import html
+import argparse
+from contextlib import contextmanager
+from functools import partial, wraps
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+import threading
+import hashlib
+import queue
+import socket
+import tempfile
+import gzip
+import signal
+from collections import Counter, defaultdict, deque, namedtuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+def lazy_import(name):
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}", name=name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+requests = lazy_import("requests")
+sys.modules.setdefault("anime_sama", sys.modules[__name__])
+
+BS4_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+HTML_PARSER_BACKEND = "selectolax" if importlib.util.find_spec("selectolax") else BS4_PARSER
+TEXTUAL_AVAILABLE = importlib.util.find_spec("textual") is not None
+
+HEADERS_BASE = {
+    "user-agent": "Mozilla/5.0 (X11; Linux x86_64; rv:134.0) Gecko/20100101 Firefox/134.0",
+    "accept-language": "en-US,en;q=0.5",
+    "connection": "keep-alive"
+}
+
+HISTORY_CHECK_WORKERS = 8
+
+SEASON_PATTERN = re.compile(r'panneauAnime\("([^"]+)",\s*"([^"]+)"\)')
+CATALOGUE_TITLE_CLASS = "text-white font-bold uppercase text-md line-clamp-2"
+CATALOGUE_TITLE_SELECTOR = "h1." + ".".join(CATALOGUE_TITLE_CLASS.split())
+EPISODES_JS_TOKEN = re.compile(
+    r"""var\s+(eps\w*)\s*=\s*\[|'([^']*)'|"([^"]*)"|(\])|(/\*.*?\*/|//[^\n]*)""",
+    re.S
+)
+SIBNET_VIDEO_ID = re.compile(r'^https?://video\.sibnet\.ru/shell\.php\?videoid=(\d+)')
+EMBED_SOURCE_PATTERNS = {
+    "sendvid": re.compile(r'(?:<source[^>]+src|property="og:video"\s+content)="([^"]+)"'),
+    "vidmoly": re.compile(r'file\s*:\s*"([^"]+\.(?:m3u8|mp4)[^"]*)"'),
+}
+MIRROR_HOSTERS = ("sibnet",) + tuple(EMBED_SOURCE_PATTERNS)
+
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_TTLS = [
+    (re.compile(r'/episodes\.js(\?|$)'), 30 * 24 * 3600),
+    (re.compile(r'^https://anime-sama\.fr/planning/?(\?|$)'), 30 * 60),
+    (re.compile(r'^https://animecountdown\.com/upcoming/?(\?|$)'), 30 * 60),
+    (re.compile(r'^https://anime-sama\.fr/catalogue/?(\?|$)'), 60 * 60),
+    (re.compile(r'^https://anime-sama\.fr/catalogue/[^/?]+/[^/?]+/[^/?]+/?(\?|$)'), 0),
+    (re.compile(r'^https://anime-sama\.fr/catalogue/.+'), 60 * 60),
+]
+CACHE_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie")
+HTTP_CACHE_MODE = "default"
+
+HEADER_PROFILES = {
+    "anime-sama.fr": {
+        "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "accept-language": "fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7",
+        "upgrade-insecure-requests": "1",
+        "sec-fetch-dest": "document",
+        "sec-fetch-mode": "navigate",
+        "sec-fetch-site": "same-origin",
+        "sec-fetch-user": "?1",
+        "referer": "https://anime-sama.fr/catalogue/"
+    },
+    "video.sibnet.ru": {
+        "referer": "https://video.sibnet.ru/"
+    },
+    "vidmoly.to": {
+        "referer": "https://anime-sama.fr/"
+    }
+}
+
+HTTP_POOL_SIZE = 16
+
+CASSETTE_FILE = "cassette.jsonl"
+CASSETTE_BODIES_DIR = "bodies"
+CASSETTE_STREAM_PREFIX = 256 * 1024
+
+TRACE_STAGES = [
+    (re.compile(r"^https://anime-sama\.fr/catalogue/?(\?|$)"), "http catalogue"),
+    (re.compile(r"^https://anime-sama\.fr/catalogue/.+/episodes\.js"), "http episodes.js"),
+    (re.compile(r"^https://anime-sama\.fr/catalogue/[^/]+/?(\?|$)"), "http page anime"),
+    (re.compile(r"^https://anime-sama\.fr/catalogue/"), "http page saison"),
+    (re.compile(r"^https://anime-sama\.fr/planning"), "http planning"),
+    (re.compile(r"^https://video\.sibnet\.ru/shell\.php"), "http sibnet shell"),
+    (re.compile(r"^https://video\.sibnet\.ru/v/"), "http sibnet 302"),
+]
+
+MIRROR_RACE_TIMEOUT = 20
+MIRROR_PROBE_BYTES = 256 * 1024
+MIRROR_STATS_WINDOW = 20
+MIRROR_STATS_MAX_AGE = 24 * 3600
+MIRROR_MIN_SAMPLES = 3
+MIRROR_SLOW_FACTOR = 3.0
+MIRROR_MIN_SUCCESS_RATE = 0.34
+
+MPV_IPC_TIMEOUT = 10
+MPV_ARGS = ("--fullscreen", "--idle=once", "--force-window=immediate")
+
+RESUME_SAVE_INTERVAL = 30
+RESUME_MIN_POSITION = 30
+RESUME_FINISHED_RATIO = 0.9
+
+PREFETCH_MAX_AGE = 60 * 60
+PREFETCH_WARM_BYTES = 512 * 1024
+
+SEARCH_DEBOUNCE = 0.25
+SEARCH_MIN_LENGTH = 2
+
+CATALOGUE_INDEX_MAX_AGE = 7 * 24 * 3600
+CATALOGUE_INDEX_MAX_PAGES = 300
+CATALOGUE_LANGUES = ("VOSTFR", "VF")
+CATALOGUE_INDEX_MIN_SCORE = 0.35
+CATALOGUE_INDEX_LIMIT = 30
+
+DOWNLOAD_JOBS = 2
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_SEGMENTS = 4
+DOWNLOAD_MIN_SEGMENT_SIZE = 2 * 1024 * 1024
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_EXPIRED_STATUSES = (401, 403, 404, 410)
+DOWNLOAD_PROGRESS_INTERVAL = 1.0
+DOWNLOAD_JOB_COLUMNS = (
+    "id", "anime_name", "saison", "season_url", "episode", "video_id", "path",
+    "status", "bytes_done", "bytes_total", "error"
+)
+
+SEASON_CHECK_TTL = 30 * 60
+SHOW_SEASONS_TTL = 24 * 3600
+
+DAEMON_INTERVAL = 10 * 60
+DAEMON_REQUESTS_PER_MINUTE = 30
+DAEMON_CYCLE_BUDGET = 200
+DAEMON_CATALOGUE_MAX_AGE = 24 * 3600
+
+HISTORY_FIELDS = """history.id, history.anime_name, history.episode, history.saison, history.url,
+    history.position, history.duration, history.finished, seasons.last_episode, seasons.checked_at"""
+HISTORY_FROM = "FROM history LEFT JOIN seasons ON seasons.season_url = history.url"
+HISTORY_SELECT = f"SELECT {HISTORY_FIELDS} {HISTORY_FROM}"
+HISTORY_COLUMNS = 10
+HISTORY_PAGE_SIZE = 50
+HISTORY_PAGE_PREFETCH = 10
+HISTORY_NEW_EPISODES = "MAX(COALESCE(seasons.last_episode, 0) - COALESCE(episode_number(history.episode), 0), 0)"
+HISTORY_SORTS = {
+    "recent": (("history.timestamp", "history.id"), "DESC"),
+    "alpha": (("history.anime_name COLLATE NOCASE", "history.id"), "ASC"),
+    "new": ((HISTORY_NEW_EPISODES, "history.timestamp", "history.id"), "DESC"),
+}
+HISTORY_SORT_LABELS = {"recent": "récents", "alpha": "alphabétique", "new": "nouveaux épisodes"}
+HISTORY_FTS_TRIGGERS = (
+    """CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts (rowid, anime_name) VALUES (new.id, new.anime_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts (history_fts, rowid, anime_name) VALUES ('delete', old.id, old.anime_name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS history_fts_update AFTER UPDATE OF anime_name ON history BEGIN
+        INSERT INTO history_fts (history_fts, rowid, anime_name) VALUES ('delete', old.id, old.anime_name);
+        INSERT INTO history_fts (rowid, anime_name) VALUES (new.id, new.anime_name);
+    END""",
+)
+
+PLANNING_URL = "https://anime-sama.fr/planning/"
+PLANNING_REFRESH_INTERVAL = 30 * 60
+PLANNING_TOKEN = re.compile(
+    r'<h2 class="titreJours[^>]*>([^<]+)</h2>'
+    r'|cartePlanningAnime\("([^"]+)", "([^"]+)", "[^"]*", "([^"]+)", "([^"]*)", "([^"]+)"\);'
+)
+PLANNING_CHANGE_MARKERS = {"new": "+", "rescheduled": "~"}
+UPCOMING_URL = "https://animecountdown.com/upcoming"
+UPCOMING_TTL = 30 * 60
+UPCOMING_ITEM_SELECTOR = "a.countdown-content-trending-item"
+UPCOMING_FIELD_SELECTORS = {
+    "title": "countdown-content-trending-item-title, .countdown-content-trending-item-title",
+    "episode": "countdown-content-trending-item-desc, .countdown-content-trending-item-desc",
+    "countdown": "countdown-content-trending-item-countdown, .countdown-content-trending-item-countdown, "
+                 "[data-time], [data-countdown], time[datetime]",
+}
+UPCOMING_TIME_ATTRIBUTES = ("data-time", "data-countdown", "datetime")
+UPCOMING_DURATION = re.compile(r'(\d+)\s*([jdhms])')
+UPCOMING_DURATION_UNITS = {"j": 86400, "d": 86400, "h": 3600, "m": 60, "s": 1}
+UPCOMING_MATCH_MIN_SCORE = 0.45
+
+MENU_ITEMS = [
+    ("Recherche d'anime", "search"),
+    ("Historique", "history"),
+    ("Planning", "planning"),
+    ("À venir", "upcoming"),
+    ("Téléchargements", "downloads")
+]
+
+def get_db_path():
+    db_dir = os.path.expanduser("~/.local/share/animesama-cli")
+    os.makedirs(db_dir, exist_ok=True)
+    return os.path.join(db_dir, "history.db")
+
+def get_download_dir():
+    return os.path.join(os.path.expanduser(os.environ.get("XDG_DOWNLOAD_DIR", "~/Downloads")), "anime-sama")
+
+def get_cache_path():
+    cache_dir = os.path.expanduser("~/.local/share/animesama-cli")
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, "http_cache.db")
+
+def migrate_history_fts(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_history_name ON history (anime_name COLLATE NOCASE, id)")
+    try:
+        conn.execute(
+            """CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                anime_name, content='history', content_rowid='id', tokenize='unicode61 remove_diacritics 1'
+            )"""
+        )
+    except sqlite3.OperationalError:
+        return
+    for trigger in HISTORY_FTS_TRIGGERS:
+        conn.execute(trigger)
+    conn.execute("INSERT INTO history_fts (history_fts) VALUES ('rebuild')")
+
+SCHEMA_MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        anime_name TEXT NOT NULL,
+        episode TEXT NOT NULL,
+        saison TEXT NOT NULL,
+        url TEXT NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    DELETE FROM history WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY anime_name, saison ORDER BY timestamp DESC, id DESC
+            ) AS rank FROM history
+        ) WHERE rank > 1
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_history_anime_saison ON history (anime_name, saison);
+    CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp DESC, id DESC);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS show_seasons (
+        show_url TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        path TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        PRIMARY KEY (show_url, position)
+    );
+    CREATE TABLE IF NOT EXISTS seasons (
+        season_url TEXT PRIMARY KEY,
+        filever TEXT NOT NULL,
+        checked_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS season_episodes (
+        season_url TEXT NOT NULL,
+        episode INTEGER NOT NULL,
+        video_id TEXT NOT NULL,
+        PRIMARY KEY (season_url, episode)
+    );
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS catalogue_index (
+        url TEXT PRIMARY KEY,
+        title TEXT NOT NULL,
+        vf INTEGER NOT NULL DEFAULT 0,
+        vostfr INTEGER NOT NULL DEFAULT 0,
+        seen_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS catalogue_meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS download_jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        anime_name TEXT NOT NULL,
+        saison TEXT NOT NULL,
+        season_url TEXT NOT NULL,
+        episode TEXT NOT NULL,
+        video_id TEXT NOT NULL,
+        path TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'pending',
+        bytes_done INTEGER NOT NULL DEFAULT 0,
+        bytes_total INTEGER,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        UNIQUE (season_url, episode)
+    );
+    CREATE INDEX IF NOT EXISTS idx_download_jobs_status ON download_jobs (status, id);
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS episode_mirrors (
+        season_url TEXT NOT NULL,
+        episode INTEGER NOT NULL,
+        player TEXT NOT NULL,
+        hoster TEXT NOT NULL,
+        url TEXT NOT NULL,
+        PRIMARY KEY (season_url, episode, player)
+    );
+    UPDATE seasons SET filever = '', checked_at = 0;
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS hoster_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        hoster TEXT NOT NULL,
+        ok INTEGER NOT NULL,
+        resolve_ms REAL,
+        ttfb_ms REAL,
+        throughput REAL,
+        recorded_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_hoster_stats_hoster ON hoster_stats (hoster, id DESC);
+    ''',
+    '''
+    ALTER TABLE history ADD COLUMN position REAL NOT NULL DEFAULT 0;
+    ALTER TABLE history ADD COLUMN duration REAL NOT NULL DEFAULT 0;
+    ALTER TABLE history ADD COLUMN finished INTEGER NOT NULL DEFAULT 1;
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS planning_weeks (
+        week TEXT PRIMARY KEY,
+        days TEXT NOT NULL,
+        digest TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS planning_entries (
+        week TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        title TEXT NOT NULL,
+        slug TEXT NOT NULL,
+        time TEXT NOT NULL,
+        version TEXT NOT NULL,
+        status TEXT NOT NULL,
+        change TEXT,
+        PRIMARY KEY (week, position)
+    );
+    ''',
+    '''
+    ALTER TABLE seasons ADD COLUMN episode_count INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE seasons ADD COLUMN last_episode INTEGER;
+    UPDATE seasons SET
+        episode_count = (SELECT COUNT(*) FROM season_episodes WHERE season_episodes.season_url = seasons.season_url),
+        last_episode = (SELECT MAX(episode) FROM season_episodes WHERE season_episodes.season_url = seasons.season_url);
+    ''',
+    migrate_history_fts,
+]
+
+class Database:
+    def __init__(self, path):
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.create_function("episode_number", 1, episode_number, deterministic=True)
+        self.conn.create_function("normalize_title", 1, normalize_title, deterministic=True)
+        self.migrate()
+        self.history_fts = self.query_one("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'") is not None
+
+    def migrate(self):
+        with self.transaction() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, script in enumerate(SCHEMA_MIGRATIONS[version:], version + 1):
+                if callable(script):
+                    script(conn)
+                else:
+                    for statement in script.split(";"):
+                        if statement.strip():
+                            conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {number}")
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def execute(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).rowcount
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def query_one(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchone()
+
+_database = None
+_database_lock = threading.Lock()
+
+def get_db():
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = Database(get_db_path())
+        return _database
+
+def add_to_history(anime_name, episode, saison, url, debug=False, verbose=True):
+    log = print if verbose or debug else (lambda *args: None)
+    try:
+        with get_db().transaction() as conn:
+            previous_rowid = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute(
+                """INSERT INTO history (anime_name, episode, saison, url) VALUES (?, ?, ?, ?)
+                ON CONFLICT(anime_name, saison) DO UPDATE SET
+                    episode = excluded.episode, position = 0, duration = 0, finished = 1,
+                    timestamp = CURRENT_TIMESTAMP""",
+                (anime_name, episode, saison, url)
+            )
+            inserted = conn.execute("SELECT last_insert_rowid()").fetchone()[0] != previous_rowid
+        if inserted:
+            if debug:
+                log("[DEBUG] Ajouté à l'historique avec succès")
+            else:
+                log("✓ Ajouté à l'historique avec succès")
+        else:
+            if debug:
+                log("[DEBUG] Historique mis à jour avec succès")
+            else:
+                log("✓ Historique mis à jour avec succès")
+    except Exception as e:
+        if debug:
+            log(f"[DEBUG] Erreur lors de l'ajout à l'historique: {e}")
+        else:
+            log(f"✗ Erreur lors de l'ajout à l'historique")
+
+def save_playback_position(anime_name, episode, saison, url, position, duration):
+    get_db().execute(
+        """INSERT INTO history (anime_name, episode, saison, url, position, duration, finished)
+        VALUES (?, ?, ?, ?, ?, ?, 0)
+        ON CONFLICT(anime_name, saison) DO UPDATE SET
+            episode = excluded.episode, position = excluded.position, duration = excluded.duration,
+            finished = 0, timestamp = CURRENT_TIMESTAMP""",
+        (anime_name, episode, saison, url, position, duration)
+    )
+
+def get_history_entries():
+    return get_db().query(f"{HISTORY_SELECT} ORDER BY history.timestamp DESC, history.id DESC")
+
+def get_history_entry(entry_id):
+    return get_db().query_one(f"{HISTORY_SELECT} WHERE history.id = ?", (entry_id,))
+
+def history_filter(db, text):
+    tokens = normalize_title(text).split()
+    if not tokens:
+        return [], []
+    if db.history_fts:
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return ["history.id IN (SELECT rowid FROM history_fts WHERE history_fts MATCH ?)"], [match]
+    return ["normalize_title(history.anime_name) LIKE ?"] * len(tokens), [f"%{token}%" for token in tokens]
+
+def get_history_page(after=None, text="", sort="recent", limit=HISTORY_PAGE_SIZE):
+    db = get_db()
+    keys, direction = HISTORY_SORTS[sort]
+    conditions, params = history_filter(db, text)
+    if after is not None:
+        conditions.append(f"({', '.join(keys)}) {'<' if direction == 'DESC' else '>'} ({', '.join('?' * len(keys))})")
+        params += list(after)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = ", ".join(f"{key} {direction}" for key in keys)
+    rows = db.query(
+        f"SELECT {HISTORY_FIELDS}, {', '.join(keys)} {HISTORY_FROM}{where} ORDER BY {order} LIMIT ?",
+        params + [limit + 1]
+    )
+    cursor = tuple(rows[limit - 1][HISTORY_COLUMNS:]) if len(rows) > limit else None
+    return [row[:HISTORY_COLUMNS] for row in rows[:limit]], cursor
+
+def format_position(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+def episode_number(episode):
+    match = re.search(r'(\d+)$', episode)
+    return int(match.group(1)) if match else None
+
+def history_new_episodes(entry):
+    last_episode = entry[8]
+    current_ep = episode_number(entry[2])
+    if last_episode is None or current_ep is None:
+        return None
+    return max(0, last_episode - current_ep)
+
+def format_history_entry(entry):
+    anime_name, episode, saison, url, position, duration, finished = entry[1:8]
+    line = f"{anime_name} - {episode} - {saison}"
+    if not finished:
+        line += f" - en cours ({format_position(position)}"
+        line += f" / {format_position(duration)})" if duration else ")"
+    new_episodes = history_new_episodes(entry)
+    if new_episodes == 1:
+        line += " - 1 nouvel épisode"
+    elif new_episodes:
+        line += f" - {new_episodes} nouveaux épisodes"
+    return line
+
+def resume_point(episodes, entry):
+    current_ep = int(re.search(r'(\d+)$', entry[2]).group(1))
+    position, finished = entry[5], entry[7]
+    if not finished and str(current_ep) in episodes:
+        return str(current_ep), position if position >= RESUME_MIN_POSITION else 0
+    return next_episode_key(episodes, current_ep), 0
+
+def delete_history_entry(entry_id):
+    get_db().execute("DELETE FROM history WHERE id = ?", (entry_id,))
+
+def get_cache_ttl(url):
+    for pattern, ttl in CACHE_TTLS:
+        if pattern.search(url):
+            return ttl
+    return None
+
+class HttpCache:
+    def __init__(self, path, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            url TEXT PRIMARY KEY,
+            status INTEGER NOT NULL,
+            headers TEXT NOT NULL,
+            body BLOB NOT NULL,
+            etag TEXT,
+            last_modified TEXT,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        )
+        ''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, etag, last_modified, expires_at FROM responses WHERE url = ?",
+                (url,)
+            ).fetchone()
+            if not row:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        status, headers, body, etag, last_modified, expires_at = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": expires_at
+        }
+
+    def put(self, url, status, headers, body, ttl):
+        now = time.time()
+        headers = {k: v for k, v in headers.items() if k.lower() not in CACHE_DROPPED_HEADERS}
+        validators = {k.lower(): v for k, v in headers.items()}
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), body, validators.get("etag"), validators.get("last-modified"),
+                 now + ttl, now, len(body))
+            )
+            self._evict()
+            self.conn.commit()
+
+    def refresh(self, url, ttl):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE url = ?",
+                (now + ttl, now, url)
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes * 0.9:
+                break
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+def get_http_cache():
+    global _http_cache
+    with _http_cache_lock:
+        if _http_cache is None:
+            _http_cache = HttpCache(get_cache_path())
+        return _http_cache
+
+def set_cache_mode(mode):
+    global HTTP_CACHE_MODE
+    HTTP_CACHE_MODE = mode
+
+def cassette_key(request):
+    return f"{request.method} {request.url} {request.headers.get('Range', '')}".rstrip()
+
+class Cassette:
+    def __init__(self, path, mode, latency=None):
+        self.path = pathlib.Path(path)
+        self.mode = mode
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.seen = Counter()
+        self.interactions = defaultdict(deque)
+        self.bodies_dir = self.path / CASSETTE_BODIES_DIR
+        if mode == "record":
+            self.bodies_dir.mkdir(parents=True, exist_ok=True)
+            self.file = open(self.path / CASSETTE_FILE, "w", encoding="utf-8")
+        else:
+            with open(self.path / CASSETTE_FILE, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.interactions[entry["key"]].append(entry)
+
+    def record(self, request, response, elapsed, body=None):
+        body = response.content if body is None else body
+        digest = hashlib.sha1(body).hexdigest()
+        body_path = self.bodies_dir / f"{digest}.gz"
+        entry = {
+            "key": cassette_key(request),
+            "status": response.status_code,
+            "headers": {k: v for k, v in response.headers.items() if k.lower() not in CACHE_DROPPED_HEADERS},
+            "body": digest,
+            "elapsed": round(elapsed, 4)
+        }
+        with self.lock:
+            self.seen[entry["key"]] += 1
+            if not body_path.exists():
+                body_path.write_bytes(gzip.compress(body))
+            self.file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def replay(self, request):
+        key = cassette_key(request)
+        with self.lock:
+            self.seen[key] += 1
+            recorded = self.interactions.get(key)
+            if not recorded:
+                raise requests.ConnectionError(f"Requête absente de la cassette : {key}")
+            entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        delay = entry["elapsed"] if self.latency is None else self.latency
+        if delay:
+            time.sleep(delay)
+        body = gzip.decompress((self.bodies_dir / f"{entry['body']}.gz").read_bytes())
+        from anime_sama_http import build_response
+        response = build_response(request, entry["status"], entry["headers"], body)
+        response.from_cassette = True
+        return response
+
+    def duplicates(self):
+        with self.lock:
+            return [(key, count) for key, count in self.seen.most_common() if count > 1]
+
+    def close(self):
+        if self.mode == "record":
+            self.file.close()
+
+HTTP_CASSETTE = None
+REQUEST_BUDGET = None
+
+def set_cassette(cassette):
+    global HTTP_CASSETTE
+    HTTP_CASSETTE = cassette
+
+def set_request_budget(limiter):
+    global REQUEST_BUDGET
+    REQUEST_BUDGET = limiter
+
+def print_cassette_report():
+    cassette = HTTP_CASSETTE
+    cassette.close()
+    total = sum(cassette.seen.values())
+    action = "enregistrée(s) dans" if cassette.mode == "record" else "rejouée(s) depuis"
+    print(f"\n{total} requête(s) {action} {cassette.path}")
+    duplicates = cassette.duplicates()
+    if duplicates:
+        print(f"{len(duplicates)} requête(s) en double :")
+        for key, count in duplicates:
+            print(f"  {count}x {key}")
+
+def trace_stage(url):
+    for pattern, name in TRACE_STAGES:
+        if pattern.search(url):
+            return name
+    return f"http {urlsplit(url).hostname}"
+
+class Tracer:
+    def __init__(self, path):
+        self.path = path
+        self.spans = []
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+        self.next_id = 0
+
+    @contextmanager
+    def span(self, name, **args):
+        stack = self.local.__dict__.setdefault("stack", [])
+        with self.lock:
+            self.next_id += 1
+            span = {
+                "id": self.next_id,
+                "parent": stack[-1]["id"] if stack else None,
+                "name": name,
+                "thread": threading.get_ident(),
+                "args": args
+            }
+        stack.append(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span["args"]["error"] = type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            span["start"] = start - self.origin
+            span["duration"] = time.perf_counter() - start
+            with self.lock:
+                self.spans.append(span)
+
+    def write(self):
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span["start"])
+        with open(self.path, "w", encoding="utf-8") as f:
+            if self.path.endswith(".json"):
+                events = [{
+                    "name": span["name"],
+                    "cat": span["name"].split()[0],
+                    "ph": "X",
+                    "ts": round(span["start"] * 1e6),
+                    "dur": round(span["duration"] * 1e6),
+                    "pid": os.getpid(),
+                    "tid": span["thread"],
+                    "args": span["args"]
+                } for span in spans]
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+                return
+            for span in spans:
+                f.write(json.dumps({
+                    "id": span["id"],
+                    "parent": span["parent"],
+                    "name": span["name"],
+                    "thread": span["thread"],
+                    "start": round(self.started_at + span["start"], 6),
+                    "duration_ms": round(span["duration"] * 1000, 3),
+                    **span["args"]
+                }, ensure_ascii=False) + "\n")
+
+    def summary(self):
+        rows = {}
+        with self.lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = rows.setdefault(span["name"], {"count": 0, "total": 0.0, "max": 0.0, "bytes": 0, "hits": 0,
+                                                 "revalidated": 0, "reused": 0})
+            row["count"] += 1
+            row["total"] += span["duration"]
+            row["max"] = max(row["max"], span["duration"])
+            row["bytes"] += span["args"].get("bytes", 0)
+            row["hits"] += span["args"].get("cache") == "hit"
+            row["revalidated"] += span["args"].get("cache") == "revalidated"
+            row["reused"] += span["args"].get("reused") is True
+        return sorted(rows.items(), key=lambda item: item[1]["total"], reverse=True)
+
+TRACER = None
+
+def set_tracer(tracer):
+    global TRACER
+    TRACER = tracer
+
+@contextmanager
+def trace_span(name, **args):
+    if TRACER is None:
+        yield {"args": {}}
+        return
+    with TRACER.span(name, **args) as span:
+        yield span
+
+def traced(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        if TRACER is None:
+            return fn(*args, **kwargs)
+        with TRACER.span(fn.__qualname__):
+            return fn(*args, **kwargs)
+    return wrapper
+
+def response_cache_state(response):
+    if getattr(response, "revalidated", False):
+        return "revalidated"
+    if getattr(response, "from_cache", False):
+        return "hit"
+    return "off" if HTTP_CACHE_MODE == "off" else "miss"
+
+def trace_response(span, response, stream=False):
+    span["args"].update({
+        "url": response.url,
+        "status": response.status_code,
+        "bytes": int(response.headers.get("Content-Length", 0)) if stream else len(response.content),
+        "cache": response_cache_state(response),
+        "reused": getattr(response, "connection_reused", None)
+    })
+
+def print_trace_summary():
+    tracer = TRACER
+    try:
+        tracer.write()
+    except OSError as e:
+        print(f"Erreur : impossible d'écrire la trace : {e}")
+    rows = tracer.summary()
+    if not rows:
+        return
+    width = max(len("Étape"), *(len(name) for name, _ in rows))
+    print(f"\nTrace écrite dans {tracer.path}")
+    print(f"{'Étape'.ljust(width)}  {'n':>4}  {'total':>9}  {'moyenne':>9}  {'max':>9}  {'octets':>10}  {'cache':>5}  "
+          f"{'304':>5}  {'réutil.':>7}")
+    for name, row in rows:
+        print(f"{name.ljust(width)}  {row['count']:>4}  {row['total'] * 1000:>7.1f}ms  "
+              f"{row['total'] * 1000 / row['count']:>7.1f}ms  {row['max'] * 1000:>7.1f}ms  "
+              f"{row['bytes']:>10}  {row['hits']:>5}  {row['revalidated']:>5}  {row['reused']:>7}")
+
+def print_connection_stats():
+    stats = get_client().stats()
+    print(f"[DEBUG] Connexions HTTP : {stats['requests']} requête(s), "
+          f"{stats['opened']} ouverte(s), {stats['reused']} réutilisée(s)")
+
+_http_client = None
+_http_client_pool_size = HTTP_POOL_SIZE
+_http_client_lock = threading.Lock()
+
+def set_client_pool_size(pool_size):
+    global _http_client_pool_size
+    _http_client_pool_size = pool_size
+
+def get_client(pool_size=None):
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            from anime_sama_http import HttpClient
+            _http_client = HttpClient(pool_size or _http_client_pool_size)
+        return _http_client
+
+def make_soup(html_content, parse_only=None):
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html_content, BS4_PARSER, parse_only=parse_only)
+
+def selectolax_parser(html_content):
+    try:
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+    except ImportError:
+        from selectolax.parser import HTMLParser
+    return HTMLParser(html_content)
+
+def get_seasons(html_content):
+    seasons = []
+    for name, path in SEASON_PATTERN.findall(html_content):
+        if "film" not in name.lower() and name.lower() != "nom":
+            seasons.append({
+                'name': name,
+                'url': path
+            })
+    return seasons
+
+def parse_catalogue_cards(html_content):
+    if HTML_PARSER_BACKEND == "selectolax":
+        cards = []
+        for card in selectolax_parser(html_content).css('a[href*="catalogue"]'):
+            titre_tag = card.css_first(CATALOGUE_TITLE_SELECTOR)
+            if titre_tag:
+                titre = titre_tag.text(strip=True)
+                if titre:
+                    cards.append((titre, card.attributes['href']))
+        return cards
+    from bs4 import SoupStrainer
+    cards = []
+    strainer = SoupStrainer('a', href=lambda href: href and 'catalogue' in href)
+    for card in make_soup(html_content, parse_only=strainer).find_all('a'):
+        titre_tag = card.find('h1', class_=CATALOGUE_TITLE_CLASS)
+        if titre_tag:
+            titre = titre_tag.text.strip()
+            if titre:
+                cards.append((titre, card['href']))
+    return cards
+
+@traced
+def parse_episodes_js(content):
+    columns = {}
+    current = None
+    for player, single, double, close, comment in EPISODES_JS_TOKEN.findall(content):
+        if player:
+            current = columns.setdefault(player, [])
+        elif current is None or comment:
+            continue
+        elif close:
+            current = None
+        else:
+            current.append((single or double).strip() or None)
+    return columns
+
+def episode_table(columns):
+    table = {}
+    for player in sorted(columns, key=lambda name: (len(name), name)):
+        for index, url in enumerate(columns[player], 1):
+            if url:
+                table.setdefault(index, {})[player] = url
+    return {str(index): table[index] for index in sorted(table)}
+
+def hoster_name(url):
+    host = (urlsplit(url).hostname or "").split(".")
+    return host[-2] if len(host) >= 2 else ".".join(host)
+
+def episode_refs(table):
+    episodes = {}
+    for ep, players in table.items():
+        for url in players.values():
+            match = SIBNET_VIDEO_ID.match(url)
+            if match:
+                episodes[ep] = match.group(1)
+                break
+        else:
+            supported = [url for url in players.values() if hoster_name(url) in MIRROR_HOSTERS]
+            if supported:
+                episodes[ep] = supported[0]
+    return episodes
+
+def get_episode_list(url):
+    url = url.replace('https://', '')
+    try:
+        response = get_client().get(f"https://{url}")
+        content = response.text
+        pattern = r'episodes\.js\?filever=(\d+)'
+        match = re.search(pattern, content)
+        if match:
+            filever = match.group(1)
+            return filever
+        return None
+    except Exception as e:
+        print(f"Erreur lors de la requête : {str(e)}")
+        return None
+
+class MetadataStore:
+    def __init__(self, db):
+        self.db = db
+
+    def get_show_seasons(self, show_url, max_age):
+        rows = self.db.query(
+            "SELECT name, path, fetched_at FROM show_seasons WHERE show_url = ? ORDER BY position",
+            (show_url,)
+        )
+        if not rows or time.time() - rows[0][2] > max_age:
+            return None
+        return [{'name': name, 'url': path} for name, path, _ in rows]
+
+    def save_show_seasons(self, show_url, seasons):
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM show_seasons WHERE show_url = ?", (show_url,))
+            conn.executemany(
+                "INSERT INTO show_seasons VALUES (?, ?, ?, ?, ?)",
+                [(show_url, i, season['name'], season['url'], now) for i, season in enumerate(seasons)]
+            )
+
+    def get_season(self, season_url):
+        with self.db.lock:
+            row = self.db.query_one(
+                "SELECT filever, checked_at FROM seasons WHERE season_url = ?", (season_url,)
+            )
+            if not row:
+                return None
+            episodes = self.db.query(
+                "SELECT episode, video_id FROM season_episodes WHERE season_url = ? ORDER BY episode",
+                (season_url,)
+            )
+        return {
+            "filever": row[0],
+            "checked_at": row[1],
+            "episodes": {str(episode): video_id for episode, video_id in episodes}
+        }
+
+    def get_mirrors(self, season_url):
+        rows = self.db.query(
+            """SELECT episode, player, hoster, url FROM episode_mirrors
+            WHERE season_url = ? ORDER BY episode, player""",
+            (season_url,)
+        )
+        mirrors = {}
+        for episode, player, hoster, url in rows:
+            mirrors.setdefault(str(episode), []).append((player, hoster, url))
+        return mirrors
+
+    def get_episode_mirrors(self, season_url, episode):
+        return self.db.query(
+            "SELECT player, hoster, url FROM episode_mirrors WHERE season_url = ? AND episode = ? ORDER BY player",
+            (season_url, int(episode))
+        )
+
+    def save_season(self, season_url, filever, episodes, table=None):
+        numbers = [int(ep) for ep in episodes if ep.isdigit()]
+        with self.db.transaction() as conn:
+            conn.execute(
+                """INSERT INTO seasons (season_url, filever, checked_at, episode_count, last_episode)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(season_url) DO UPDATE SET filever = excluded.filever, checked_at = excluded.checked_at,
+                    episode_count = excluded.episode_count, last_episode = excluded.last_episode""",
+                (season_url, filever, time.time(), len(numbers), max(numbers, default=None))
+            )
+            conn.execute("DELETE FROM season_episodes WHERE season_url = ?", (season_url,))
+            conn.executemany(
+                "INSERT INTO season_episodes VALUES (?, ?, ?)",
+                [(season_url, int(ep), video_id) for ep, video_id in episodes.items() if ep.isdigit()]
+            )
+            if table is not None:
+                conn.execute("DELETE FROM episode_mirrors WHERE season_url = ?", (season_url,))
+                conn.executemany(
+                    "INSERT INTO episode_mirrors VALUES (?, ?, ?, ?, ?)",
+                    [(season_url, int(ep), player, hoster_name(url), url)
+                     for ep, players in table.items() for player, url in players.items()]
+                )
+
+    def touch_season(self, season_url):
+        self.db.execute("UPDATE seasons SET checked_at = ? WHERE season_url = ?", (time.time(), season_url))
+
+_metadata_store = None
+_metadata_store_lock = threading.Lock()
+
+def get_metadata_store():
+    global _metadata_store
+    with _metadata_store_lock:
+        if _metadata_store is None:
+            _metadata_store = MetadataStore(get_db())
+        return _metadata_store
+
+class AnimeDownloader:
+    def __init__(self, debug=False):
+        self.client = get_client()
+        self.debug = debug
+
+    def debug_print(self, *args, **kwargs):
+        if self.debug:
+            print("[DEBUG]", *args, **kwargs)
+
+    @traced
+    def get_episode_table(self, complete_url, filever):
+        complete_url = complete_url.replace('https://', '')
+        url = f"https://{complete_url}/episodes.js"
+        try:
+            response = self.client.get(url, params={"filever": filever})
+            response.raise_for_status()
+            return episode_table(parse_episodes_js(response.text))
+        except requests.RequestException as e:
+            print(f"Erreur lors de la récupération des épisodes : {e}")
+            return {}
+
+    def get_anime_episode(self, complete_url, filever):
+        return episode_refs(self.get_episode_table(complete_url, filever))
+
+    @traced
+    def get_video_url(self, video_id, verbose=True):
+        log = print if verbose else self.debug_print
+        try:
+            url = f"https://video.sibnet.ru/shell.php"
+            log(f"Tentative de récupération de la vidéo {video_id}...")
+            response = self.client.get(url, params={"videoid": video_id})
+            response.raise_for_status()
+            html_content = response.text
+            log("Recherche du pattern dans le contenu HTML...")
+            match = re.search(r'player\.src\(\[\{src: "/v/([^/]+)/', html_content)
+            if match:
+                video_hash = match.group(1)
+                url_sibnet = f"https://video.sibnet.ru/v/{video_hash}/{video_id}.mp4"
+                log(f"URL construite : {url_sibnet}")
+                headers_sibnet = {
+                    "range": "bytes=0-",
+                    "accept-encoding": "identity"
+                }
+                response_sibnet = self.client.get(url_sibnet, headers=headers_sibnet, allow_redirects=False)
+                if response_sibnet.status_code == 302:
+                    return response_sibnet.headers['Location']
+                else:
+                    log(f"Status code inattendu : {response_sibnet.status_code}")
+            else:
+                log("Pattern non trouvé dans le HTML")
+            return None
+        except requests.RequestException as e:
+            log(f"Erreur lors de la récupération de l'URL vidéo : {e}")
+            return None
+
+    def resolve_video(self, ref, verbose=True):
+        if ref.isdigit():
+            return normalize_video_url(self.get_video_url(ref, verbose=verbose))
+        return self.resolve_mirror(hoster_name(ref), ref, verbose=verbose)
+
+    @traced
+    def resolve_mirror(self, hoster, url, verbose=False):
+        log = print if verbose else self.debug_print
+        if hoster == "sibnet":
+            match = SIBNET_VIDEO_ID.match(url)
+            return normalize_video_url(self.get_video_url(match.group(1), verbose=verbose)) if match else None
+        pattern = EMBED_SOURCE_PATTERNS.get(hoster)
+        if not pattern:
+            return None
+        try:
+            log(f"Récupération du lecteur {hoster}...")
+            response = self.client.get(url, timeout=15)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            log(f"Erreur lors de la récupération du lecteur {hoster} : {e}")
+            return None
+        match = pattern.search(response.text)
+        if not match:
+            log(f"Source vidéo introuvable sur {hoster}")
+            return None
+        return normalize_video_url(html.unescape(match.group(1)))
+
+    @traced
+    def get_catalogue(self, query="", vf=False): 
+        try:
+            url = "https://anime-sama.fr/catalogue/"
+            querystring = {"search": query, "type[]": "Anime"}
+            if vf:
+                querystring["langue[]"] = "VF"
+            self.debug_print(f"Envoi requête GET vers: {url}")
+            self.debug_print(f"Headers: {self.client.headers_for(url)}")
+            self.debug_print(f"Querystring: {querystring}")
+            response = self.client.get(url, params=querystring)
+            response.raise_for_status()
+            self.debug_print(f"Status code: {response.status_code}")
+            self.debug_print(f"Réponse brute: {response.text}")
+            cards = parse_catalogue_cards(response.text)
+            animes = [titre for titre, _ in cards]
+            urls = [href for _, href in cards]
+            if vf:
+                urls = [link.replace("vostfr", "vf") for link in urls]
+            self.debug_print(f"Nombre de titres trouvés: {len(animes)}")
+            self.debug_print(f"Titres trouvés: {animes}")
+            return animes, urls
+        except requests.RequestException as e:
+            print(f"Erreur lors de la récupération du catalogue : {e}")
+            self.debug_print(f"Exception complète: {str(e)}")
+            return [], []
+
+    @traced
+    def get_catalogue_page(self, page, langue):
+        url = "https://anime-sama.fr/catalogue/"
+        querystring = {"type[]": "Anime", "langue[]": langue, "page": page}
+        self.debug_print(f"Page du catalogue {page} ({langue})")
+        response = self.client.get(url, params=querystring)
+        response.raise_for_status()
+        return parse_catalogue_cards(response.text)
+
+@traced
+def load_show_seasons(show_url):
+    store = get_metadata_store()
+    seasons = store.get_show_seasons(show_url, SHOW_SEASONS_TTL)
+    if seasons is not None:
+        return seasons
+    try:
+        response = get_client().get(show_url)
+        seasons = get_seasons(response.text)
+    except requests.RequestException:
+        return []
+    if seasons:
+        store.save_show_seasons(show_url, seasons)
+    return seasons
+
+@traced
+def load_season_episodes(season_url, downloader=None, max_age=SEASON_CHECK_TTL):
+    store = get_metadata_store()
+    cached = store.get_season(season_url)
+    if cached and cached["episodes"] and time.time() - cached["checked_at"] < max_age:
+        return cached["episodes"]
+    filever = get_episode_list(season_url)
+    if not filever:
+        return cached["episodes"] if cached else None
+    if cached and cached["episodes"] and cached["filever"] == filever:
+        store.touch_season(season_url)
+        return cached["episodes"]
+    table = (downloader or AnimeDownloader()).get_episode_table(season_url, filever)
+    episodes = episode_refs(table)
+    if table:
+        store.save_season(season_url, filever, episodes, table)
+    return episodes
+
+def load_season_mirrors(season_url, downloader=None):
+    if load_season_episodes(season_url, downloader) is None:
+        return {}
+    return get_metadata_store().get_mirrors(season_url)
+
+def normalize_title(title):
+    title = unicodedata.normalize("NFKD", title.lower())
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    return " ".join(re.findall(r'[a-z0-9]+', title))
+
+def title_trigrams(title):
+    padded = f"  {title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class CatalogueIndex:
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.entries = None
+        self.trigrams = None
+
+    def last_crawl(self):
+        row = self.db.query_one("SELECT value FROM catalogue_meta WHERE key = 'crawled_at'")
+        return float(row[0]) if row else 0.0
+
+    def is_fresh(self, max_age=CATALOGUE_INDEX_MAX_AGE):
+        return time.time() - self.last_crawl() < max_age
+
+    def crawl_resume(self):
+        row = self.db.query_one("SELECT value FROM catalogue_meta WHERE key = 'crawl_resume'")
+        if not row:
+            return None
+        resume = json.loads(row[0])
+        if time.time() - resume["started_at"] > CATALOGUE_INDEX_MAX_AGE:
+            return None
+        return resume
+
+    def crawl(self, downloader=None, log=print, should_stop=None):
+        downloader = downloader or AnimeDownloader(debug=False)
+        resumed = self.crawl_resume()
+        if resumed:
+            log(f"Reprise du parcours du catalogue : {resumed['langue']} page {resumed['page']}")
+        resume = resumed or {"started_at": time.time(), "langue": CATALOGUE_LANGUES[0], "page": 1, "complete": True}
+        started_at = resume["started_at"]
+        found = {}
+        failed = False
+        complete = resume["complete"]
+        for langue in CATALOGUE_LANGUES[CATALOGUE_LANGUES.index(resume["langue"]):]:
+            first_page = resume["page"] if langue == resume["langue"] else 1
+            for page in range(first_page, CATALOGUE_INDEX_MAX_PAGES + 1):
+                if should_stop and should_stop():
+                    log("Parcours du catalogue interrompu")
+                    failed = True
+                    break
+                try:
+                    cards = downloader.get_catalogue_page(page, langue)
+                except requests.RequestException as e:
+                    log(f"Erreur sur la page {page} ({langue}) : {e}")
+                    failed = True
+                    break
+                new_cards = [(titre, href) for titre, href in cards if (href, langue) not in found]
+                if not new_cards:
+                    break
+                for titre, href in new_cards:
+                    found[(href, langue)] = titre
+                log(f"{langue} page {page} : {len(new_cards)} anime(s)")
+            else:
+                complete = False
+            if failed:
+                break
+        if not found and (failed or not resumed):
+            return 0
+        with self.db.transaction() as conn:
+            for (href, langue), titre in found.items():
+                column = "vf" if langue == "VF" else "vostfr"
+                conn.execute(
+                    f"""INSERT INTO catalogue_index (url, title, {column}, seen_at) VALUES (?, ?, 1, ?)
+                    ON CONFLICT(url) DO UPDATE SET title = excluded.title, {column} = 1, seen_at = excluded.seen_at""",
+                    (href, titre, started_at)
+                )
+            if failed:
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalogue_meta VALUES ('crawl_resume', ?)",
+                    (json.dumps({"started_at": started_at, "langue": langue, "page": page, "complete": complete}),)
+                )
+            else:
+                if complete:
+                    conn.execute("DELETE FROM catalogue_index WHERE seen_at < ?", (started_at,))
+                conn.execute(
+                    "INSERT OR REPLACE INTO catalogue_meta VALUES ('crawled_at', ?)", (str(started_at),)
+                )
+                conn.execute("DELETE FROM catalogue_meta WHERE key = 'crawl_resume'")
+        with self.lock:
+            self.entries = None
+        if failed:
+            return 0
+        return self.db.query_one("SELECT COUNT(*) FROM catalogue_index")[0]
+
+    def _load(self):
+        with self.lock:
+            if self.entries is not None:
+                return
+            rows = self.db.query("SELECT title, url, vf FROM catalogue_index ORDER BY title")
+            self.entries = []
+            self.trigrams = {}
+            for i, (title, url, vf) in enumerate(rows):
+                norm = normalize_title(title)
+                grams = title_trigrams(norm)
+                self.entries.append((title, url, bool(vf), norm, len(grams)))
+                for gram in grams:
+                    self.trigrams.setdefault(gram, []).append(i)
+
+    def score(self, query, vf=False):
+        self._load()
+        norm_query = normalize_title(query)
+        if not norm_query:
+            return []
+        query_grams = title_trigrams(norm_query)
+        counts = {}
+        for gram in query_grams:
+            for i in self.trigrams.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        scored = []
+        for i, common in counts.items():
+            title, url, has_vf, norm, size = self.entries[i]
+            if vf and not has_vf:
+                continue
+            score = common / (len(query_grams) + size - common)
+            if norm_query in norm:
+                score += 1.0
+            elif common == len(query_grams):
+                score += 0.5
+            if score >= CATALOGUE_INDEX_MIN_SCORE:
+                scored.append((-score, title, url))
+        scored.sort()
+        return scored
+
+    def search(self, query, vf=False, limit=CATALOGUE_INDEX_LIMIT):
+        scored = self.score(query, vf)
+        animes = [title for _, title, _ in scored[:limit]]
+        urls = [url for _, _, url in scored[:limit]]
+        if vf:
+            urls = [link.replace("vostfr", "vf") for link in urls]
+        return animes, urls
+
+    def best_match(self, title, min_score=UPCOMING_MATCH_MIN_SCORE):
+        scored = self.score(title)
+        if not scored or -scored[0][0] < min_score:
+            return None
+        _, match_title, url = scored[0]
+        return match_title, url
+
+_catalogue_index = None
+_catalogue_index_lock = threading.Lock()
+
+def get_catalogue_index():
+    global _catalogue_index
+    with _catalogue_index_lock:
+        if _catalogue_index is None:
+            _catalogue_index = CatalogueIndex(get_db())
+        return _catalogue_index
+
+def search_catalogue(query, vf=False, debug=False):
+    index = get_catalogue_index()
+    if index.is_fresh():
+        animes, urls = index.search(query, vf)
+        if animes:
+            if debug:
+                print(f"[DEBUG] {len(animes)} résultat(s) trouvé(s) dans l'index local")
+            return animes, urls
+    return AnimeDownloader(debug=debug).get_catalogue(query, vf=vf)
+
+def update_catalogue_index(debug=False):
+    print("Mise à jour de l'index local du catalogue...")
+    previous_mode = HTTP_CACHE_MODE
+    if previous_mode == "default":
+        set_cache_mode("refresh")
+    try:
+        count = get_catalogue_index().crawl(AnimeDownloader(debug=debug))
+    finally:
+        set_cache_mode(previous_mode)
+    if count:
+        print(f"✓ Index mis à jour : {count} anime(s)")
+    else:
+        print("✗ Impossible de mettre à jour l'index du catalogue")
+
+PlanningEntry = namedtuple("PlanningEntry", "day title slug time version status change", defaults=("", None))
+
+def planning_week(now=None):
+    year, week, _ = (now or datetime.now()).isocalendar()
+    return f"{year}-W{week:02d}"
+
+def parse_planning(html_content):
+    days, entries, day = [], [], None
+    for match in PLANNING_TOKEN.finditer(html_content):
+        if match.group(1) is not None:
+            day = match.group(1).strip()
+            if day not in days:
+                days.append(day)
+        elif day is not None:
+            title, slug, hour, status, version = match.group(2, 3, 4, 5, 6)
+            entries.append(PlanningEntry(day, title, slug, hour, version, status))
+    return days, entries
+
+def diff_planning(previous, entries, sticky=False):
+    if not previous:
+        return list(entries)
+    slots = defaultdict(dict)
+    for entry in previous:
+        slots[entry.slug][(entry.day, entry.time, entry.status)] = entry.change if sticky else None
+    diffed = []
+    for entry in entries:
+        if entry.slug not in slots:
+            change = "new"
+        else:
+            change = slots[entry.slug].get((entry.day, entry.time, entry.status), "rescheduled")
+        diffed.append(entry._replace(change=change))
+    return diffed
+
+class PlanningStore:
+    def __init__(self, db):
+        self.db = db
+        self.lock = threading.Lock()
+        self.week = None
+        self.days = []
+        self.entries = []
+        self.digest = None
+        self.fetched_at = 0.0
+
+    def _entries(self, week):
+        rows = self.db.query(
+            """SELECT day, title, slug, time, version, status, change FROM planning_entries
+            WHERE week = ? ORDER BY position""", (week,)
+        )
+        return [PlanningEntry(*row) for row in rows]
+
+    def _load(self, week):
+        row = self.db.query_one("SELECT days, digest, fetched_at FROM planning_weeks WHERE week = ?", (week,))
+        if not row:
+            return False
+        days, digest, fetched_at = row
+        if self.week != week or fetched_at > self.fetched_at:
+            self.week, self.days, self.digest, self.fetched_at = week, json.loads(days), digest, fetched_at
+            self.entries = self._entries(week)
+        return True
+
+    def _previous_entries(self, week):
+        row = self.db.query_one(
+            "SELECT week FROM planning_weeks WHERE week < ? ORDER BY week DESC LIMIT 1", (week,)
+        )
+        return self._entries(row[0]) if row else []
+
+    def _refresh(self, week):
+        response = get_client().get(PLANNING_URL)
+        response.raise_for_status()
+        fetched_at = time.time()
+        digest = hashlib.sha1(response.content).hexdigest()
+        if self.week == week and digest == self.digest:
+            self.db.execute("UPDATE planning_weeks SET fetched_at = ? WHERE week = ?", (fetched_at, week))
+            self.fetched_at = fetched_at
+            return False
+        days, entries = parse_planning(response.text)
+        if self.week == week:
+            entries = diff_planning(self.entries, entries, sticky=True)
+        else:
+            entries = diff_planning(self._previous_entries(week), entries)
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO planning_weeks VALUES (?, ?, ?, ?)",
+                (week, json.dumps(days), digest, fetched_at)
+            )
+            conn.execute("DELETE FROM planning_entries WHERE week = ?", (week,))
+            conn.executemany(
+                "INSERT INTO planning_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(week, position) + tuple(entry) for position, entry in enumerate(entries)]
+            )
+            kept = "SELECT week FROM planning_weeks ORDER BY week DESC LIMIT 2"
+            conn.execute(f"DELETE FROM planning_entries WHERE week NOT IN ({kept})")
+            conn.execute(f"DELETE FROM planning_weeks WHERE week NOT IN ({kept})")
+        self.week, self.days, self.entries, self.digest, self.fetched_at = week, days, entries, digest, fetched_at
+        return True
+
+    def get(self, max_age=PLANNING_REFRESH_INTERVAL):
+        week = planning_week()
+        with self.lock:
+            if self._load(week) and time.time() - self.fetched_at < max_age:
+                return self.days, self.entries
+            try:
+                self._refresh(week)
+            except requests.RequestException:
+                if self.week != week:
+                    raise
+            return self.days, self.entries
+
+    def refresh(self):
+        week = planning_week()
+        with self.lock:
+            self._load(week)
+            return self._refresh(week)
+
+_planning_store = None
+_planning_store_lock = threading.Lock()
+
+def get_planning_store():
+    global _planning_store
+    with _planning_store_lock:
+        if _planning_store is None:
+            _planning_store = PlanningStore(get_db())
+        return _planning_store
+
+def get_planning(max_age=PLANNING_REFRESH_INTERVAL):
+    days, entries = get_planning_store().get(max_age)
+    planning = {day: [] for day in days}
+    for entry in entries:
+        planning[entry.day].append(entry)
+    return days, planning
+
+def format_planning_day(day, entries):
+    changed = sum(1 for entry in entries if entry.change)
+    return f"{day} ({changed} changement(s))" if changed else day
+
+def format_planning_entry(entry):
+    marker = PLANNING_CHANGE_MARKERS.get(entry.change)
+    label = f"{entry.title} - {entry.time} - {entry.version}"
+    if entry.status:
+        label += f" ({entry.status})"
+    return f"{marker} {label}" if marker else label
+
+UpcomingEntry = namedtuple("UpcomingEntry", "title episode airs_at match", defaults=(None,))
+
+def upcoming_airs_at(value, reference):
+    value = (value or "").strip()
+    if value.isdigit():
+        number = int(value)
+        if number > 10 ** 12:
+            return number / 1000
+        return number if number > 10 ** 9 else reference + number
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        pass
+    parts = UPCOMING_DURATION.findall(value.lower())
+    if not parts:
+        return None
+    return reference + sum(int(amount) * UPCOMING_DURATION_UNITS[unit] for amount, unit in parts)
+
+def upcoming_countdown_value(attributes, text):
+    for attribute in UPCOMING_TIME_ATTRIBUTES:
+        if attributes.get(attribute):
+            return attributes[attribute]
+    return text
+
+def parse_upcoming(html_content, reference=None):
+    reference = time.time() if reference is None else reference
+    entries = []
+    if HTML_PARSER_BACKEND == "selectolax":
+        for item in selectolax_parser(html_content).css(UPCOMING_ITEM_SELECTOR):
+            fields = {name: item.css_first(selector) for name, selector in UPCOMING_FIELD_SELECTORS.items()}
+            if not fields["title"]:
+                continue
+            countdown = fields["countdown"]
+            value = upcoming_countdown_value(countdown.attributes, countdown.text(strip=True)) if countdown else None
+            entries.append(UpcomingEntry(
+                fields["title"].text(strip=True),
+                fields["episode"].text(strip=True) if fields["episode"] else "",
+                upcoming_airs_at(value, reference)
+            ))
+        return entries
+    for item in make_soup(html_content).select(UPCOMING_ITEM_SELECTOR):
+        fields = {name: item.select_one(selector) for name, selector in UPCOMING_FIELD_SELECTORS.items()}
+        if not fields["title"]:
+            continue
+        countdown = fields["countdown"]
+        value = upcoming_countdown_value(countdown.attrs, countdown.get_text(strip=True)) if countdown else None
+        entries.append(UpcomingEntry(
+            fields["title"].get_text(strip=True),
+            fields["episode"].get_text(strip=True) if fields["episode"] else "",
+            upcoming_airs_at(value, reference)
+        ))
+    return entries
+
+def response_date(response):
+    from email.utils import parsedate_to_datetime
+    try:
+        return parsedate_to_datetime(response.headers["Date"]).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+class UpcomingStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = None
+        self.fetched_at = 0.0
+
+    def get(self, max_age=UPCOMING_TTL):
+        with self.lock:
+            if self.entries is not None and time.time() - self.fetched_at < max_age:
+                return self.entries
+            response = get_client().get(UPCOMING_URL)
+            response.raise_for_status()
+            entries = parse_upcoming(response.text, response_date(response))
+            index = get_catalogue_index()
+            if index.last_crawl():
+                entries = [entry._replace(match=index.best_match(entry.title)) for entry in entries]
+            entries.sort(key=lambda entry: float("inf") if entry.airs_at is None else entry.airs_at)
+            self.entries, self.fetched_at = entries, time.time()
+            return entries
+
+_upcoming_store = None
+_upcoming_store_lock = threading.Lock()
+
+def get_upcoming_store():
+    global _upcoming_store
+    with _upcoming_store_lock:
+        if _upcoming_store is None:
+            _upcoming_store = UpcomingStore()
+        return _upcoming_store
+
+def get_upcoming(max_age=UPCOMING_TTL):
+    return get_upcoming_store().get(max_age)
+
+def resolve_upcoming(entry):
+    if entry.match:
+        return entry.match
+    animes, urls = search_catalogue(entry.title)
+    return (animes[0], urls[0]) if animes else None
+
+def format_countdown(seconds):
+    if seconds <= 0:
+        return "disponible"
+    days, seconds = divmod(int(seconds), 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    if days:
+        return f"dans {days}j {hours:02d}h {minutes:02d}m"
+    return f"dans {hours:02d}h {minutes:02d}m {seconds:02d}s"
+
+def format_upcoming_entry(entry, now=None):
+    line = f"{entry.title} - {entry.episode}" if entry.episode else entry.title
+    if entry.airs_at is not None:
+        line += f" - {format_countdown(entry.airs_at - (time.time() if now is None else now))}"
+    return f"✓ {line}" if entry.match else line
+
+class MetadataRefresher:
+    def __init__(self, interval=DAEMON_INTERVAL, budget=DAEMON_CYCLE_BUDGET, log=print):
+        self.interval = interval
+        self.budget = budget
+        self.log = log
+        self.downloader = AnimeDownloader(debug=False)
+        self.stop = threading.Event()
+        self.cycle_start = 0
+
+    def remaining(self):
+        return self.budget - (get_client().stats()["requests"] - self.cycle_start)
+
+    def exhausted(self):
+        return self.stop.is_set() or self.remaining() <= 0
+
+    def history_seasons(self):
+        rows = get_db().query(
+            """SELECT DISTINCT history.url FROM history
+            LEFT JOIN seasons ON seasons.season_url = history.url
+            ORDER BY COALESCE(seasons.checked_at, 0)"""
+        )
+        return [url for (url,) in rows]
+
+    def refresh_seasons(self):
+        store = get_metadata_store()
+        checked = updated = 0
+        for url in self.history_seasons():
+            if self.exhausted():
+                break
+            before = store.get_season(url)
+            if before and before["episodes"] and time.time() - before["checked_at"] < self.interval / 2:
+                continue
+            episodes = load_season_episodes(url, self.downloader, max_age=0)
+            checked += 1
+            if episodes and (not before or before["episodes"] != episodes):
+                updated += 1
+        return checked, updated
+
+    def refresh_planning(self):
+        try:
+            get_planning_store().refresh()
+            return True
+        except requests.RequestException as e:
+            self.log(f"Erreur lors du rafraîchissement du planning : {e}")
+            return False
+
+    def refresh_catalogue(self):
+        index = get_catalogue_index()
+        if index.is_fresh(DAEMON_CATALOGUE_MAX_AGE):
+            return None
+        return index.crawl(self.downloader, log=lambda message: None, should_stop=self.exhausted)
+
+    def run_cycle(self):
+        self.cycle_start = get_client().stats()["requests"]
+        checked, updated = self.refresh_seasons()
+        summary = [f"{checked} saison(s) vérifiée(s), {updated} mise(s) à jour"]
+        if not self.exhausted() and self.refresh_planning():
+            summary.append("planning rafraîchi")
+        if not self.exhausted():
+            count = self.refresh_catalogue()
+            if count:
+                summary.append(f"index du catalogue : {count} anime(s)")
+            elif count is not None:
+                summary.append("index du catalogue interrompu" if self.exhausted() else "index du catalogue inaccessible")
+        used = get_client().stats()["requests"] - self.cycle_start
+        self.log(f"{', '.join(summary)} ({used} requête(s))")
+
+    def run(self, once=False):
+        while not self.stop.is_set():
+            self.run_cycle()
+            if once or self.stop.wait(self.interval):
+                break
+
+def acquire_daemon_lock():
+    handle = open(os.path.join(os.path.dirname(get_db_path()), "daemon.lock"), "w")
+    if fcntl is None:
+        return handle
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+def daemon_log(message):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+def daemon_main(args):
+    lock = acquire_daemon_lock()
+    if lock is None:
+        print("Un rafraîchissement en arrière-plan est déjà en cours d'exécution.")
+        return
+    if args.budget <= 0 or args.interval <= 0:
+        print("--budget et --interval doivent être strictement positifs.")
+        return
+    if HTTP_CACHE_MODE == "default":
+        set_cache_mode("refresh")
+    set_request_budget(BandwidthLimiter(args.budget / 60))
+    refresher = MetadataRefresher(args.interval * 60, DAEMON_CYCLE_BUDGET, daemon_log)
+    signal.signal(signal.SIGTERM, lambda signum, frame: refresher.stop.set())
+    daemon_log(f"Rafraîchissement toutes les {args.interval:g} min, {args.budget} requête(s)/min au plus")
+    try:
+        refresher.run(once=args.once)
+    except KeyboardInterrupt:
+        pass
+    daemon_log("Arrêt du rafraîchissement")
+
+def normalize_video_url(video_url):
+    if video_url and video_url.startswith('//'):
+        return 'https:' + video_url
+    return video_url
+
+def next_episode_key(episodes, current):
+    ep_keys_int = sorted(int(e) for e in episodes.keys() if e.isdigit())
+    for ep in ep_keys_int:
+        if ep > int(current):
+            return str(ep)
+    return None
+
+class HosterStats:
+    def __init__(self, db):
+        self.db = db
+
+    def record(self, hoster, ok, resolve_ms=None, ttfb_ms=None, throughput=None):
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT INTO hoster_stats (hoster, ok, resolve_ms, ttfb_ms, throughput, recorded_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (hoster, int(ok), resolve_ms, ttfb_ms, throughput, time.time())
+            )
+            conn.execute(
+                """DELETE FROM hoster_stats WHERE hoster = ? AND id NOT IN (
+                    SELECT id FROM hoster_stats WHERE hoster = ? ORDER BY id DESC LIMIT ?
+                )""",
+                (hoster, hoster, MIRROR_STATS_WINDOW)
+            )
+
+    def summary(self):
+        rows = self.db.query(
+            "SELECT hoster, ok, resolve_ms, ttfb_ms FROM hoster_stats WHERE recorded_at > ? ORDER BY hoster, id DESC",
+            (time.time() - MIRROR_STATS_MAX_AGE,)
+        )
+        stats = {}
+        for hoster, ok, resolve_ms, ttfb_ms in rows:
+            entry = stats.setdefault(hoster, {"samples": 0, "ok": 0, "latencies": []})
+            entry["samples"] += 1
+            if ok:
+                entry["ok"] += 1
+                entry["latencies"].append((resolve_ms or 0) + (ttfb_ms or 0))
+        for entry in stats.values():
+            latencies = sorted(entry.pop("latencies"))
+            entry["median_ms"] = latencies[len(latencies) // 2] if latencies else None
+            entry["success_rate"] = entry["ok"] / entry["samples"]
+        return stats
+
+    def select(self, mirrors):
+        stats = self.summary()
+        medians = [entry["median_ms"] for entry in stats.values() if entry["median_ms"] is not None]
+        best = min(medians) if medians else None
+        kept = []
+        for mirror in mirrors:
+            entry = stats.get(mirror[1])
+            if entry and entry["samples"] >= MIRROR_MIN_SAMPLES and (
+                entry["success_rate"] < MIRROR_MIN_SUCCESS_RATE
+                or (entry["median_ms"] is not None and best and entry["median_ms"] > best * MIRROR_SLOW_FACTOR)
+            ):
+                continue
+            kept.append(mirror)
+        return kept or list(mirrors)
+
+class MirrorRacer:
+    def __init__(self, downloader, stats):
+        self.downloader = downloader
+        self.stats = stats
+
+    @traced
+    def resolve(self, ref, mirrors=None, verbose=True):
+        candidates = [mirror for mirror in mirrors or () if mirror[1] in MIRROR_HOSTERS]
+        if len(candidates) < 2:
+            return self.downloader.resolve_video(ref, verbose=verbose)
+        winner = self.race(self.stats.select(candidates))
+        if winner:
+            if verbose:
+                print(f"Lecteur le plus rapide : {winner[1]}")
+            return winner[0]
+        if verbose:
+            print("Aucun lecteur n'a répondu à temps, tentative avec le lecteur par défaut...")
+        return self.downloader.resolve_video(ref, verbose=verbose)
+
+    def race(self, mirrors):
+        if len(mirrors) == 1:
+            player, hoster, url = mirrors[0]
+            video_url = self.downloader.resolve_mirror(hoster, url)
+            return (video_url, hoster) if video_url else None
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(mirrors))
+        futures = [executor.submit(self.try_mirror, mirror, cancelled) for mirror in mirrors]
+        try:
+            for future in as_completed(futures, timeout=MIRROR_RACE_TIMEOUT):
+                winner = future.result()
+                if winner:
+                    return winner
+        except FutureTimeoutError:
+            return None
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        return None
+
+    def try_mirror(self, mirror, cancelled):
+        player, hoster, url = mirror
+        start = time.perf_counter()
+        try:
+            video_url = self.downloader.resolve_mirror(hoster, url)
+            if not video_url:
+                self.stats.record(hoster, False)
+                return None
+            resolve_ms = (time.perf_counter() - start) * 1000
+            probe = self.probe(video_url, cancelled)
+        except requests.RequestException:
+            self.stats.record(hoster, False)
+            return None
+        if not probe:
+            self.stats.record(hoster, False, resolve_ms)
+            return None
+        ttfb, throughput = probe
+        self.stats.record(hoster, True, resolve_ms, ttfb * 1000, throughput)
+        if cancelled.is_set():
+            return None
+        return video_url, hoster
+
+    def probe(self, video_url, cancelled, depth=0):
+        start = time.perf_counter()
+        headers = {"range": f"bytes=0-{MIRROR_PROBE_BYTES - 1}", "accept-encoding": "identity"}
+        with self.downloader.client.get(video_url, headers=headers, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            ttfb = time.perf_counter() - start
+            if ".m3u8" in urlsplit(response.url).path and depth < 2:
+                playlist = [line.strip() for line in response.text.splitlines() if line.strip() and not line.startswith("#")]
+                if not playlist:
+                    return None
+                nested = self.probe(urljoin(response.url, playlist[0]), cancelled, depth + 1)
+                return (ttfb + nested[0], nested[1]) if nested else None
+            received = 0
+            for chunk in response.iter_content(64 * 1024):
+                if cancelled.is_set():
+                    return ttfb, None
+                received += len(chunk)
+                if received >= MIRROR_PROBE_BYTES:
+                    break
+        elapsed = max(time.perf_counter() - start - ttfb, 1e-3)
+        return ttfb, received / elapsed
+
+_mirror_racer = None
+_mirror_racer_lock = threading.Lock()
+
+def get_mirror_racer():
+    global _mirror_racer
+    with _mirror_racer_lock:
+        if _mirror_racer is None:
+            _mirror_racer = MirrorRacer(AnimeDownloader(), HosterStats(get_db()))
+        return _mirror_racer
+
+def episode_mirrors(season_url, episode):
+    try:
+        return get_metadata_store().get_episode_mirrors(season_url, episode)
+    except ValueError:
+        return []
+
+class EpisodePrefetcher:
+    def __init__(self):
+        self.downloader = AnimeDownloader(debug=False)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.lock = threading.Lock()
+        self.pending = {}
+
+    def prefetch(self, video_id, mirrors=None):
+        with self.lock:
+            if video_id in self.pending:
+                return
+            self.pending[video_id] = (time.time(), self.executor.submit(self._resolve, video_id, mirrors))
+
+    @traced
+    def resolve(self, video_id, verbose=True, mirrors=None):
+        with self.lock:
+            pending = self.pending.pop(video_id, None)
+        if pending:
+            started_at, future = pending
+            try:
+                video_url = future.result()
+            except Exception:
+                video_url = None
+            if video_url and time.time() - started_at < PREFETCH_MAX_AGE:
+                return video_url
+        return get_mirror_racer().resolve(video_id, mirrors, verbose=verbose)
+
+    def _resolve(self, video_id, mirrors=None):
+        video_url = get_mirror_racer().resolve(video_id, mirrors, verbose=False)
+        if video_url and ".m3u8" not in video_url:
+            self._warm(video_url)
+        return video_url
+
+    def _warm(self, video_url):
+        try:
+            response = self.downloader.client.get(
+                video_url,
+                headers={"range": f"bytes=0-{PREFETCH_WARM_BYTES - 1}", "accept-encoding": "identity"},
+                stream=True,
+                timeout=10
+            )
+            for _ in response.iter_content(64 * 1024):
+                pass
+            response.close()
+        except requests.RequestException:
+            pass
+
+_prefetcher = None
+_prefetcher_lock = threading.Lock()
+
+def get_prefetcher():
+    global _prefetcher
+    with _prefetcher_lock:
+        if _prefetcher is None:
+            _prefetcher = EpisodePrefetcher()
+        return _prefetcher
+
+class MpvError(Exception):
+    pass
+
+class MpvController:
+    def __init__(self):
+        self.socket_path = os.path.join(
+            tempfile.gettempdir(), f"animesama-mpv-{os.getpid()}-{threading.get_ident()}.sock"
+        )
+        self.process = None
+        self.sock = None
+        self.lock = threading.Lock()
+        self.replies = {}
+        self.reply_ready = threading.Condition()
+        self.next_request = 0
+        self.closed = False
+        self.events = queue.Queue()
+
+    def start(self):
+        if not hasattr(socket, "AF_UNIX"):
+            raise MpvError("IPC par socket Unix indisponible")
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.process = subprocess.Popen(
+            ['mpv', *MPV_ARGS, f'--input-ipc-server={self.socket_path}'],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + MPV_IPC_TIMEOUT
+        while True:
+            if self.process.poll() is not None:
+                raise MpvError(f"mpv s'est arrêté au démarrage (code {self.process.returncode})")
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+                break
+            except OSError:
+                sock.close()
+                if time.monotonic() > deadline:
+                    self.process.kill()
+                    raise MpvError("Le socket IPC de mpv n'est jamais apparu")
+                time.sleep(0.05)
+        self.sock = sock
+        threading.Thread(target=self.read_messages, daemon=True).start()
+
+    def read_messages(self):
+        try:
+            with self.sock.makefile("rb") as stream:
+                for line in stream:
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "request_id" in message:
+                        with self.reply_ready:
+                            self.replies[message["request_id"]] = message
+                            self.reply_ready.notify_all()
+                    elif "event" in message:
+                        self.events.put(message)
+        except OSError:
+            pass
+        with self.reply_ready:
+            self.closed = True
+            self.reply_ready.notify_all()
+        self.events.put(None)
+
+    def command(self, *args, **named):
+        with self.lock:
+            self.next_request += 1
+            request_id = self.next_request
+            command = {"name": args[0], **named} if named else list(args)
+            payload = json.dumps({"command": command, "request_id": request_id}) + "\n"
+            try:
+                self.sock.sendall(payload.encode())
+            except OSError as e:
+                raise MpvError(f"mpv ne répond plus : {e}")
+        with self.reply_ready:
+            self.reply_ready.wait_for(lambda: request_id in self.replies or self.closed, MPV_IPC_TIMEOUT)
+            reply = self.replies.pop(request_id, None)
+        if reply is None:
+            raise MpvError("mpv ne répond plus")
+        if reply.get("error") != "success":
+            raise MpvError(f"{args[0]} : {reply.get('error')}")
+        return reply.get("data")
+
+    def kill(self):
+        if self.process.poll() is None:
+            self.process.kill()
+        return self.wait()
+
+    def wait(self):
+        returncode = self.process.wait()
+        if self.sock:
+            self.sock.close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        return returncode
+
+class PlaybackSession:
+    def __init__(self, episodes, ep_key, anime_name, saison, url, debug=False, log=print,
+                 on_recorded=None, verbose=True, start=0):
+        self.episodes = episodes
+        self.ep_key = ep_key
+        self.anime_name = anime_name
+        self.saison = saison
+        self.url = url
+        self.debug = debug
+        self.log = log
+        self.on_recorded = on_recorded or (lambda ep: None)
+        self.verbose = verbose
+        self.prefetcher = get_prefetcher()
+        self.controller = MpvController()
+        self.playlist = []
+        self.queued = set()
+        self.current = None
+        self.recorded = None
+        self.start = start
+        self.progress_lock = threading.Lock()
+        self.position = 0
+        self.duration = 0
+        self.saved_at = 0
+
+    def resolve(self, ep):
+        return self.prefetcher.resolve(self.episodes[ep], verbose=False, mirrors=episode_mirrors(self.url, ep))
+
+    def record(self, ep):
+        if ep is None or ep == self.recorded:
+            return
+        add_to_history(
+            anime_name=self.anime_name,
+            episode=f"Episode {ep}",
+            saison=self.saison,
+            url=self.url,
+            debug=self.debug,
+            verbose=self.verbose
+        )
+        self.recorded = ep
+        self.on_recorded(ep)
+
+    def update_progress(self, ep, position, duration, force=False):
+        with self.progress_lock:
+            if ep != self.current:
+                return
+            self.position = position
+            self.duration = duration or self.duration
+            if ep == self.recorded or not (force or time.monotonic() - self.saved_at >= RESUME_SAVE_INTERVAL):
+                return
+            self.saved_at = time.monotonic()
+        try:
+            save_playback_position(self.anime_name, f"Episode {ep}", self.saison, self.url, position, self.duration)
+        except sqlite3.Error as e:
+            if self.debug:
+                self.log(f"[DEBUG] Erreur lors de l'enregistrement de la position : {e}")
+
+    def watched_enough(self):
+        return bool(self.duration) and self.position >= self.duration * RESUME_FINISHED_RATIO
+
+    def finish_current(self):
+        if self.current is None or self.current == self.recorded:
+            return
+        if self.watched_enough():
+            self.record(self.current)
+        else:
+            self.update_progress(self.current, self.position, self.duration, force=True)
+
+    def play(self, ep):
+        self.finish_current()
+        with self.progress_lock:
+            self.current = ep
+            self.position = self.start if ep == self.ep_key else 0
+            self.duration = 0
+        self.log(f"Lecture de l'épisode {ep} avec mpv...")
+        self.queue_next(ep)
+
+    def property_changed(self, name, value):
+        if name == "playlist-pos":
+            if isinstance(value, int) and 0 <= value < len(self.playlist):
+                self.play(self.playlist[value])
+        elif name == "time-pos" and value is not None:
+            self.update_progress(self.current, value, None)
+        elif name == "duration" and value:
+            with self.progress_lock:
+                self.duration = value
+
+    def queue_episode(self, ep):
+        video_url = self.resolve(ep)
+        if not video_url:
+            self.log(f"Impossible de récupérer l'URL de l'épisode {ep}.")
+            return
+        try:
+            self.controller.command("loadfile", video_url, "append")
+            self.playlist.append(ep)
+        except MpvError:
+            pass
+
+    def queue_next(self, ep):
+        next_key = next_episode_key(self.episodes, ep)
+        if next_key and next_key not in self.queued:
+            self.queued.add(next_key)
+            threading.Thread(target=self.queue_episode, args=(next_key,), daemon=True).start()
+
+    def run(self):
+        with trace_span("mpv (démarrage)"):
+            self.controller.start()
+        try:
+            return self.control()
+        except Exception:
+            self.controller.kill()
+            raise
+
+    def control(self):
+        self.log(f"Récupération de l'épisode {self.ep_key}...")
+        video_url = self.resolve(self.ep_key)
+        if not video_url:
+            self.controller.command("quit")
+            self.controller.wait()
+            self.log("Impossible de récupérer l'URL de la vidéo.")
+            return False
+        for observer, name in enumerate(("playlist-pos", "duration", "time-pos"), 1):
+            self.controller.command("observe_property", observer, name)
+        if self.start:
+            self.controller.command("loadfile", url=video_url, flags="replace", options=f"start={self.start:.1f}")
+        else:
+            self.controller.command("loadfile", video_url, "replace")
+        self.playlist.append(self.ep_key)
+        self.queued.add(self.ep_key)
+        while True:
+            event = self.controller.events.get()
+            if event is None:
+                break
+            if event.get("event") == "property-change":
+                self.property_changed(event.get("name"), event.get("data"))
+            elif event.get("event") == "end-file" and event.get("reason") == "eof":
+                self.record(self.current)
+        with trace_span("mpv (fermeture)"):
+            returncode = self.controller.wait()
+        if returncode == 0:
+            self.finish_current()
+        elif self.current != self.recorded:
+            if self.duration:
+                self.update_progress(self.current, self.position, self.duration, force=True)
+            self.log(f"Erreur lors de la lecture : mpv a quitté avec le code {returncode}")
+        return True
+
+def mpv_start_args(start):
+    return [f"--start={start:.1f}"] if start else []
+
+def watch_episodes(episodes, ep_key, anime_name, saison, url, debug=False, start=0):
+    try:
+        PlaybackSession(episodes, ep_key, anime_name, saison, url, debug=debug, start=start).run()
+        return
+    except FileNotFoundError:
+        print("Erreur : mpv n'est pas installé.")
+        return
+    except MpvError as e:
+        if debug:
+            print(f"[DEBUG] Contrôle IPC de mpv indisponible ({e}), lecture épisode par épisode")
+    prefetcher = get_prefetcher()
+    while ep_key:
+        print(f"Récupération de l'épisode {ep_key}...")
+        video_url = prefetcher.resolve(episodes[ep_key], mirrors=episode_mirrors(url, ep_key))
+        if not video_url:
+            print("Impossible de récupérer l'URL de la vidéo.")
+            return
+        next_key = next_episode_key(episodes, ep_key)
+        if next_key:
+            prefetcher.prefetch(episodes[next_key], episode_mirrors(url, next_key))
+        print(f"Lecture de la vidéo avec mpv...")
+        try:
+            with trace_span("mpv", episode=ep_key):
+                subprocess.run(['mpv', video_url, '--fullscreen', *mpv_start_args(start)], check=True)
+        except FileNotFoundError:
+            print("Erreur : mpv n'est pas installé.")
+            return
+        except Exception as e:
+            print(f"Erreur lors de la lecture : {e}")
+            return
+        add_to_history(
+            anime_name=anime_name,
+            episode=f"Episode {ep_key}",
+            saison=saison,
+            url=url,
+            debug=debug
+        )
+        if not next_key:
+            return
+        choix = input(f"Regarder l'épisode {next_key} ? (o/N) : ").strip().lower()
+        if choix not in ("o", "oui"):
+            return
+        ep_key = next_key
+        start = 0
+
+def format_saison(name, season_url):
+    saison = name
+    if "saison" not in saison.lower():
+        match = re.search(r'/saison(\d+)', season_url, re.IGNORECASE)
+        if match:
+            saison = f"Saison {match.group(1)}"
+    if "vostfr" in season_url.lower():
+        version_str = "VOSTFR"
+    elif re.search(r'/vf/?', season_url.lower()):
+        version_str = "VF"
+    else:
+        version_str = ""
+    if version_str and version_str.lower() not in saison.lower():
+        saison = f"{saison} - {version_str}"
+    return saison
+
+def parse_episode_range(text):
+    episodes = []
+    for part in text.split(","):
+        start, _, end = part.strip().partition("-")
+        if not start.isdigit() or (end and not end.isdigit()):
+            raise ValueError(f"Plage d'épisodes invalide : {part.strip()}")
+        episodes.extend(str(ep) for ep in range(int(start), int(end or start) + 1))
+    return episodes
+
+def parse_rate(text):
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([kKmMgG]?)', text.strip())
+    if not match:
+        raise ValueError(f"Débit invalide : {text}")
+    return int(float(match.group(1)) * 1024 ** " kmg".index(match.group(2).lower() or " "))
+
+def format_bytes(size):
+    for unit in ("o", "Ko", "Mo", "Go"):
+        if size < 1024 or unit == "Go":
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024
+
+def safe_filename(name):
+    return re.sub(r'[\\/:*?"<>|\x00-\x1f]', "_", name).strip(" .") or "_"
+
+def episode_path(anime_name, saison, episode, output_dir=None):
+    folder = os.path.join(output_dir or get_download_dir(), safe_filename(anime_name), safe_filename(saison))
+    number = f"{int(episode):02d}" if episode.isdigit() else episode
+    return os.path.join(folder, safe_filename(f"{anime_name} - {saison} - E{number}") + ".mp4")
+
+class DownloadQueue:
+    def __init__(self, db):
+        self.db = db
+
+    def enqueue(self, anime_name, saison, season_url, episodes, output_dir=None):
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.executemany(
+                """INSERT INTO download_jobs
+                    (anime_name, saison, season_url, episode, video_id, path, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(season_url, episode) DO UPDATE SET
+                    video_id = excluded.video_id, status = 'pending', error = NULL, updated_at = excluded.updated_at
+                WHERE download_jobs.status != 'done'""",
+                [(anime_name, saison, season_url, ep, video_id,
+                  episode_path(anime_name, saison, ep, output_dir), now, now)
+                 for ep, video_id in episodes.items()]
+            )
+
+    def jobs(self, statuses=None):
+        sql = f"SELECT {', '.join(DOWNLOAD_JOB_COLUMNS)} FROM download_jobs"
+        params = ()
+        if statuses:
+            sql += f" WHERE status IN ({', '.join('?' * len(statuses))})"
+            params = tuple(statuses)
+        rows = self.db.query(sql + " ORDER BY id", params)
+        return [dict(zip(DOWNLOAD_JOB_COLUMNS, row)) for row in rows]
+
+    def pending(self):
+        return self.jobs(("pending", "running", "failed"))
+
+    def update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        self.db.execute(f"UPDATE download_jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def clear_finished(self):
+        return self.db.execute("DELETE FROM download_jobs WHERE status = 'done'")
+
+_download_queue = None
+_download_queue_lock = threading.Lock()
+
+def get_download_queue():
+    global _download_queue
+    with _download_queue_lock:
+        if _download_queue is None:
+            _download_queue = DownloadQueue(get_db())
+        return _download_queue
+
+class BandwidthLimiter:
+    def __init__(self, rate=0):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.allowance = rate
+        self.last = time.monotonic()
+
+    def consume(self, amount):
+        if not self.rate:
+            return
+        with self.lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.last) * self.rate) - amount
+            self.last = now
+            delay = -self.allowance / self.rate if self.allowance < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+class DownloadCancelled(Exception):
+    pass
+
+def download_stream(client, url, path, limiter=None, progress=None, cancelled=None):
+    part_path = path + ".part"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"range": f"bytes={offset}-", "accept-encoding": "identity"}
+    with client.get(url, headers=headers, stream=True, timeout=30) as response:
+        if response.status_code == 416 and offset:
+            total = offset
+        else:
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+            content_range = response.headers.get("Content-Range", "")
+            if "/" in content_range and content_range.rsplit("/", 1)[1].isdigit():
+                total = int(content_range.rsplit("/", 1)[1])
+            else:
+                total = offset + int(response.headers.get("Content-Length", 0)) or None
+            with open(part_path, "ab" if offset else "wb") as f:
+                done = offset
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    if cancelled and cancelled.is_set():
+                        raise DownloadCancelled()
+                    if limiter:
+                        limiter.consume(len(chunk))
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress:
+                        progress(done, total)
+    os.replace(part_path, path)
+    return total
+
+class SegmentedDownload:
+    def __init__(self, client, url, path, limiter=None, progress=None, cancelled=None,
+                 segments=DOWNLOAD_SEGMENTS, refresh_url=None):
+        self.client = client
+        self.url = url
+        self.url_generation = 0
+        self.path = path
+        self.part_path = path + ".part"
+        self.state_path = path + ".part.json"
+        self.limiter = limiter
+        self.progress = progress
+        self.cancelled = cancelled or threading.Event()
+        self.failed = threading.Event()
+        self.segments = max(1, segments)
+        self.refresh_url = refresh_url
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.state = None
+        self.saved_at = 0
+        self.fd = None
+
+    def run(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        total = self.probe()
+        if not total:
+            return download_stream(self.client, self.url, self.path, self.limiter, self.progress, self.cancelled)
+        self.state = self.load_state(total) or self.new_state(total)
+        if not os.path.exists(self.part_path):
+            open(self.part_path, "wb").close()
+        self.fd = os.open(self.part_path, os.O_RDWR)
+        try:
+            if os.fstat(self.fd).st_size != total:
+                os.ftruncate(self.fd, total)
+            self.save_state(force=True)
+            pending = [segment for segment in self.state["segments"] if segment[2] <= segment[1]]
+            if pending:
+                with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+                    futures = [executor.submit(self.fetch_segment, segment) for segment in pending]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        self.failed.set()
+                        raise
+        finally:
+            os.close(self.fd)
+            self.save_state(force=True)
+        os.replace(self.part_path, self.path)
+        os.remove(self.state_path)
+        return total
+
+    def probe(self):
+        headers = {"range": "bytes=0-0", "accept-encoding": "identity"}
+        with self.client.get(self.url, headers=headers, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            content_range = response.headers.get("Content-Range", "")
+            if response.status_code == 206 and content_range.rsplit("/", 1)[-1].isdigit():
+                return int(content_range.rsplit("/", 1)[1])
+        return None
+
+    def new_state(self, total):
+        count = max(1, min(self.segments, total // DOWNLOAD_MIN_SEGMENT_SIZE))
+        size = -(-total // count)
+        bounds = [(start, min(start + size, total) - 1) for start in range(0, total, size)]
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+        return {"total": total, "segments": [[start, end, start] for start, end in bounds]}
+
+    def load_state(self, total):
+        if not os.path.exists(self.part_path):
+            return None
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get("total") != total:
+            return None
+        return state
+
+    def save_state(self, force=False):
+        now = time.monotonic()
+        with self.lock:
+            if not force and now - self.saved_at < DOWNLOAD_PROGRESS_INTERVAL:
+                return
+            self.saved_at = now
+            data = json.dumps(self.state)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.state_path)
+
+    def done(self):
+        return sum(segment[2] - segment[0] for segment in self.state["segments"])
+
+    def current_url(self):
+        with self.refresh_lock:
+            return self.url, self.url_generation
+
+    def renew_url(self, generation):
+        with self.refresh_lock:
+            if generation != self.url_generation:
+                return
+            url = self.refresh_url() if self.refresh_url else None
+            if not url:
+                raise ValueError("Lien vidéo expiré et impossible à renouveler")
+            self.url = url
+            self.url_generation += 1
+
+    def fetch_segment(self, segment):
+        retries = 0
+        while segment[2] <= segment[1]:
+            url, generation = self.current_url()
+            headers = {"range": f"bytes={segment[2]}-{segment[1]}", "accept-encoding": "identity"}
+            start = segment[2]
+            try:
+                with self.client.get(url, headers=headers, stream=True, timeout=30) as response:
+                    if response.status_code in DOWNLOAD_EXPIRED_STATUSES:
+                        retries += 1
+                        if retries > DOWNLOAD_RETRIES:
+                            response.raise_for_status()
+                        self.renew_url(generation)
+                        continue
+                    response.raise_for_status()
+                    if response.status_code != 206:
+                        raise ValueError("Le serveur a ignoré la requête Range")
+                    for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                        if self.cancelled.is_set():
+                            raise DownloadCancelled()
+                        if self.failed.is_set():
+                            return
+                        chunk = chunk[:segment[1] + 1 - segment[2]]
+                        if self.limiter:
+                            self.limiter.consume(len(chunk))
+                        os.pwrite(self.fd, chunk, segment[2])
+                        with self.lock:
+                            segment[2] += len(chunk)
+                        retries = 0
+                        if self.progress:
+                            self.progress(self.done(), self.state["total"])
+                        self.save_state()
+                        if segment[2] > segment[1]:
+                            break
+                if segment[2] == start:
+                    retries += 1
+                    if retries > DOWNLOAD_RETRIES:
+                        raise ValueError("Le serveur n'envoie plus de données")
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError):
+                retries += 1
+                if retries > DOWNLOAD_RETRIES:
+                    raise
+                time.sleep(retries)
+
+def download_file(client, url, path, limiter=None, progress=None, cancelled=None,
+                  segments=DOWNLOAD_SEGMENTS, refresh_url=None):
+    return SegmentedDownload(client, url, path, limiter, progress, cancelled, segments, refresh_url).run()
+
+class DownloadScheduler:
+    def __init__(self, queue, jobs=DOWNLOAD_JOBS, rate=0, on_event=None, segments=DOWNLOAD_SEGMENTS):
+        self.queue = queue
+        self.max_jobs = jobs
+        self.segments = segments
+        self.limiter = BandwidthLimiter(rate)
+        self.on_event = on_event or (lambda job, event: None)
+        self.downloader = AnimeDownloader()
+        self.cancelled = threading.Event()
+        self.running = False
+        self.active = {}
+
+    def run(self):
+        self.running = True
+        self.cancelled.clear()
+        try:
+            attempted = []
+            with ThreadPoolExecutor(max_workers=max(1, self.max_jobs)) as executor:
+                while not self.cancelled.is_set():
+                    seen = {job["id"] for job in attempted}
+                    jobs = [job for job in self.queue.pending() if job["id"] not in seen]
+                    if not jobs:
+                        break
+                    attempted.extend(jobs)
+                    futures = [executor.submit(self.run_job, job) for job in jobs]
+                    try:
+                        for future in as_completed(futures):
+                            future.result()
+                    except BaseException:
+                        self.cancel()
+                        raise
+            return attempted
+        finally:
+            self.running = False
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run_job(self, job):
+        if self.cancelled.is_set():
+            return
+        self.queue.update(job["id"], status="running", error=None)
+        job.update(status="running", speed=0.0)
+        self.active[job["id"]] = job
+        self.on_event(job, "start")
+        try:
+            self._run_job(job)
+        finally:
+            self.active.pop(job["id"], None)
+
+    def _run_job(self, job):
+        try:
+            if os.path.exists(job["path"]):
+                job["bytes_done"] = job["bytes_total"] = os.path.getsize(job["path"])
+            else:
+                video_url = self.resolve_video_url(job["video_id"])
+                if not video_url:
+                    raise ValueError("URL de la vidéo introuvable")
+                job["bytes_total"] = download_file(
+                    self.downloader.client, video_url, job["path"],
+                    self.limiter, partial(self.report_progress, job, time.monotonic()), self.cancelled,
+                    self.segments, partial(self.resolve_video_url, job["video_id"])
+                )
+                job["bytes_done"] = job["bytes_total"] or job["bytes_done"]
+        except DownloadCancelled:
+            job["status"] = "pending"
+            self.queue.update(job["id"], status="pending", bytes_done=job["bytes_done"])
+            return
+        except (requests.RequestException, OSError, ValueError) as e:
+            job.update(status="failed", error=str(e))
+            self.queue.update(job["id"], status="failed", error=str(e), bytes_done=job["bytes_done"])
+            self.on_event(job, "failed")
+            return
+        job["status"] = "done"
+        self.queue.update(job["id"], status="done", bytes_done=job["bytes_done"], bytes_total=job["bytes_total"])
+        self.on_event(job, "done")
+
+    def resolve_video_url(self, video_id):
+        video_url = self.downloader.resolve_video(video_id, verbose=False)
+        if video_url and ".m3u8" in video_url:
+            raise ValueError("Flux HLS non pris en charge pour le téléchargement")
+        return video_url
+
+    def report_progress(self, job, started, done, total):
+        first = job.setdefault("session_start", done)
+        job.update(bytes_done=done, bytes_total=total)
+        job["speed"] = (done - first) / max(time.monotonic() - started, 1e-3)
+        now = time.monotonic()
+        if now - job.get("saved_at", 0) >= DOWNLOAD_PROGRESS_INTERVAL:
+            job["saved_at"] = now
+            self.queue.update(job["id"], bytes_done=done, bytes_total=total)
+            self.on_event(job, "progress")
+
+_download_scheduler = None
+_download_scheduler_lock = threading.Lock()
+
+def get_download_scheduler(jobs=DOWNLOAD_JOBS, rate=0, segments=DOWNLOAD_SEGMENTS):
+    global _download_scheduler
+    with _download_scheduler_lock:
+        if _download_scheduler is None:
+            _download_scheduler = DownloadScheduler(get_download_queue(), jobs=jobs, rate=rate, segments=segments)
+        return _download_scheduler
+
+def format_job_progress(job):
+    label = f"{job['anime_name']} - {job['saison']} - Episode {job['episode']}"
+    if job["status"] == "done":
+        return f"{label} : terminé"
+    if job["status"] == "failed":
+        return f"{label} : échec ({job['error']})"
+    if job["status"] == "pending":
+        return f"{label} : en attente"
+    if job["bytes_total"]:
+        percent = job["bytes_done"] * 100 // job["bytes_total"]
+        progress = f"{percent}% de {format_bytes(job['bytes_total'])}"
+    else:
+        progress = format_bytes(job["bytes_done"])
+    speed = f", {format_bytes(job['speed'])}/s" if job.get("speed") else ""
+    return f"{label} : {progress}{speed}"
+
+def select_download_season(args):
+    query = " ".join(args.query)
+    print(f"🔍 Recherche de : {query}")
+    animes, urls = search_catalogue(query, vf=args.vf, debug=args.debug)
+    if not animes:
+        print("Aucun anime trouvé.")
+        return None
+    selected = 0
+    if len(animes) > 1:
+        print("\nRésultats :")
+        for i, anime in enumerate(animes, 1):
+            print(f"{i}. {anime}")
+        idx = input("Numéro de l'anime à télécharger : ").strip()
+        if not idx.isdigit() or int(idx) < 1 or int(idx) > len(animes):
+            print("Sélection invalide.")
+            return None
+        selected = int(idx) - 1
+    seasons = load_show_seasons(urls[selected])
+    if not seasons:
+        print("Aucune saison trouvée.")
+        return None
+    season_number = args.season
+    if season_number is None:
+        print("\nSaisons :")
+        for i, season in enumerate(seasons, 1):
+            print(f"{i}. {season['name']}")
+        idx = input("Numéro de la saison à télécharger : ").strip()
+        season_number = int(idx) if idx.isdigit() else 0
+    if season_number < 1 or season_number > len(seasons):
+        print("Sélection invalide.")
+        return None
+    season = seasons[season_number - 1]
+    season_url = urls[selected].rstrip('/') + '/' + season['url'].lstrip('/')
+    if args.vf:
+        season_url = season_url.replace("vostfr", "vf")
+    return animes[selected], format_saison(season["name"], season_url), season_url
+
+def download_main(args):
+    queue = get_download_queue()
+    if args.query:
+        selection = select_download_season(args)
+        if not selection:
+            return
+        anime_name, saison, season_url = selection
+        episodes = load_season_episodes(season_url)
+        if not episodes:
+            print("Impossible de récupérer la liste des épisodes.")
+            return
+        if args.episodes:
+            wanted = parse_episode_range(args.episodes)
+            missing = [ep for ep in wanted if ep not in episodes]
+            if missing:
+                print(f"Épisode(s) introuvable(s) : {', '.join(missing)}")
+            episodes = {ep: episodes[ep] for ep in wanted if ep in episodes}
+        queue.enqueue(anime_name, saison, season_url, episodes, args.output)
+        print(f"{len(episodes)} épisode(s) de {anime_name} - {saison} ajouté(s) à la file.")
+    pending = queue.pending()
+    if not pending:
+        print("Aucun téléchargement en attente.")
+        return
+    print(f"Téléchargement de {len(pending)} épisode(s), {args.jobs} à la fois"
+          + (f", limité à {format_bytes(args.limit_rate)}/s" if args.limit_rate else "") + "...")
+    active = {}
+    print_lock = threading.Lock()
+
+    def on_event(job, event):
+        with print_lock:
+            if event == "progress":
+                active[job["id"]] = job
+                line = " | ".join(f"E{item['episode']} {format_job_progress(item).rsplit(' : ', 1)[1]}"
+                                  for item in active.values())
+                print(f"\r\033[K{line}", end="", flush=True)
+                return
+            active.pop(job["id"], None)
+            if event != "start":
+                print(f"\r\033[K{format_job_progress(job)}")
+
+    scheduler = DownloadScheduler(queue, jobs=args.jobs, rate=args.limit_rate, on_event=on_event, segments=args.segments)
+    try:
+        jobs = scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.cancel()
+        print("\nTéléchargements interrompus, ils reprendront au prochain lancement de --download.")
+        return
+    failed = sum(1 for job in jobs if job["status"] == "failed")
+    print(f"Téléchargements terminés : {len(jobs) - failed} réussi(s), {failed} échec(s).")
+    if failed:
+        print("Relancez anime --download pour réessayer les épisodes en échec.")
+
+@traced
+def revalidate_history_entry(entry, downloader, max_age):
+    load_season_episodes(entry[4], downloader, max_age)
+    return get_history_entry(entry[0]) or entry
+
+def revalidate_history(entries, max_workers=HISTORY_CHECK_WORKERS, max_age=SEASON_CHECK_TTL):
+    stale = {}
+    for i, entry in enumerate(entries):
+        if entry[8] is not None and time.time() - entry[9] < max_age:
+            yield i, entry
+        else:
+            stale[i] = entry
+    if not stale:
+        return
+    downloader = AnimeDownloader(debug=False)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {
+            executor.submit(revalidate_history_entry, entry, downloader, max_age): i
+            for i, entry in stale.items()
+        }
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                yield i, future.result()
+            except Exception:
+                yield i, entries[i]
+
+def display_history(full_check=False, workers=HISTORY_CHECK_WORKERS, sort="recent"):
+    text = ""
+    if full_check:
+        history_entries, cursor = get_history_entries(), None
+    else:
+        history_entries, cursor = get_history_page(sort=sort)
+    if not history_entries:
+        print("Aucun historique trouvé.")
+        return
+    print("\nHistorique :")
+
+    def history_line(i, entry):
+        line = f"{i + 1}. {format_history_entry(entry)}"
+        if history_new_episodes(entry) == 0:
+            line += " - Dernier épisode"
+        return line
+
+    if full_check:
+        results = {}
+        next_to_print = 0
+        for i, entry in revalidate_history(history_entries, workers):
+            history_entries[i] = entry
+            results[i] = entry
+            while next_to_print in results:
+                print(history_line(next_to_print, results.pop(next_to_print)))
+                next_to_print += 1
+    else:
+        for i, entry in enumerate(history_entries):
+            print(history_line(i, entry))
+    while True:
+        print("0. Retour")
+        prompt = "Numéro à relire, 'd' suivi du numéro pour supprimer (ex: d2)"
+        if cursor:
+            prompt += ", 'n' pour la page suivante"
+        if not full_check:
+            prompt += ", '/' suivi d'un nom pour filtrer, 's' pour changer le tri"
+        choix = input(f"{prompt}, ou 0 pour retour : ").strip()
+        if choix == "n" and cursor:
+            page, cursor = get_history_page(cursor, text, sort)
+            for i, entry in enumerate(page, len(history_entries)):
+                print(history_line(i, entry))
+            history_entries += page
+            continue
+        if not full_check and (choix == "s" or choix.startswith("/")):
+            if choix == "s":
+                sorts = list(HISTORY_SORTS)
+                sort = sorts[(sorts.index(sort) + 1) % len(sorts)]
+            else:
+                text = choix[1:].strip()
+            history_entries, cursor = get_history_page(text=text, sort=sort)
+            print(f"\nHistorique (tri : {HISTORY_SORT_LABELS[sort]}{f', filtre : {text}' if text else ''}) :")
+            if not history_entries:
+                print("Aucun résultat.")
+            for i, entry in enumerate(history_entries):
+                print(history_line(i, entry))
+            continue
+        break
+    if choix == "0":
+        return
+    if choix.startswith('d') and choix[1:].isdigit():
+        idx = int(choix[1:]) - 1
+        if 0 <= idx < len(history_entries):
+            entry_id = history_entries[idx][0]
+            delete_history_entry(entry_id)
+            print("Entrée supprimée.")
+        else:
+            print("Numéro invalide.")
+        return
+    if choix.isdigit():
+        idx = int(choix) - 1
+        if 0 <= idx < len(history_entries):
+            entry = history_entries[idx]
+            anime_name, episode, saison, url = entry[1:5]
+            print(f"Lecture de {anime_name} - {episode} - {saison}")
+            match = re.search(r'(\d+)$', episode)
+            if match:
+                current_ep = int(match.group(1))
+            else:
+                print("Impossible de déterminer l'épisode courant.")
+                return
+            episodes = load_season_episodes(url)
+            if episodes is None:
+                print("Impossible de récupérer la liste des épisodes.")
+                return
+            if not episodes:
+                print("Aucun épisode trouvé.")
+                return
+            next_ep, start = resume_point(episodes, entry)
+            if next_ep is None:
+                print(f"Vous avez déjà vu le dernier épisode : {anime_name} - Episode {current_ep} - {saison} - Dernier épisode (déjà vu)")
+                return
+            if start:
+                print(f"Reprise de l'épisode {next_ep} à {format_position(start)}")
+            watch_episodes(episodes, next_ep, anime_name, saison, url, start=start)
+        else:
+            print("Numéro invalide.")
+        return
+    print("Entrée non reconnue.")
+
+def afficher_planning():
+    print("\n--- Planning des animes (texte) ---")
+    try:
+        days_list, planning = get_planning()
+    except requests.RequestException as e:
+        print(f"Erreur lors de la récupération du planning : {e}")
+        return
+    if not days_list:
+        print("Aucun planning trouvé.")
+        return
+    for i, day in enumerate(days_list, 1):
+        print(f"{i}. {format_planning_day(day, planning[day])}")
+    print("0. Retour")
+    choix = input("Numéro du jour : ").strip()
+    if choix == "0":
+        return
+    if not choix.isdigit() or int(choix) < 1 or int(choix) > len(days_list):
+        print("Numéro invalide.")
+        return
+    selected_day = days_list[int(choix)-1]
+    animes = planning[selected_day]
+    if not animes:
+        print("Aucun anime ce jour.")
+        return
+    for i, entry in enumerate(animes, 1):
+        print(f"{i}. {format_planning_entry(entry)}")
+    if any(entry.change for entry in animes):
+        print("(+ : nouveau, ~ : horaire modifié)")
+    print("0. Retour")
+    choix = input("Numéro de l'anime : ").strip()
+    if choix == "0":
+        return
+    if not choix.isdigit() or int(choix) < 1 or int(choix) > len(animes):
+        print("Numéro invalide.")
+        return
+    selected_anime = animes[int(choix)-1]
+    anime_url = f"https://anime-sama.fr/catalogue/{selected_anime.slug}"
+    print(f"URL de la saison : {anime_url}")
+    afficher_episodes_saison(anime_url, selected_anime.title, selected_anime.version)
+
+def display_upcoming():
+    print("\n--- Prochains épisodes à sortir (texte) ---")
+    try:
+        entries = get_upcoming()
+    except requests.RequestException as e:
+        print(f"Erreur lors de la récupération des prochains épisodes : {e}")
+        return
+    if not entries:
+        print("Aucun épisode à venir trouvé.")
+        return
+    for i, entry in enumerate(entries, 1):
+        print(f"{i}. {format_upcoming_entry(entry)}")
+    print("(✓ : disponible sur anime-sama)")
+    print("0. Retour")
+    choix = input("Numéro de l'anime à ouvrir : ").strip()
+    if choix == "0" or not choix:
+        return
+    if not choix.isdigit() or int(choix) < 1 or int(choix) > len(entries):
+        print("Numéro invalide.")
+        return
+    match = resolve_upcoming(entries[int(choix) - 1])
+    if not match:
+        print("Anime introuvable sur anime-sama.")
+        return
+    anime_name, anime_url = match
+    print(f"URL de l'anime : {anime_url}")
+    seasons = load_show_seasons(anime_url)
+    if not seasons:
+        print("Aucune saison trouvée.")
+        return
+    for i, season in enumerate(seasons, 1):
+        print(f"{i}. {season['name']}")
+    choix = input("Numéro de la saison à sélectionner : ").strip()
+    if not choix.isdigit() or int(choix) < 1 or int(choix) > len(seasons):
+        print("Sélection invalide.")
+        return
+    season = seasons[int(choix) - 1]
+    season_url = anime_url.rstrip('/') + '/' + season['url'].lstrip('/')
+    afficher_episodes_saison(season_url, anime_name, season['name'])
+
+def display_help():
+    help_text = """
+Usage: anime [OPTIONS] [SEARCH_TERM]
+
+Options:
+    -h, --help      Affiche ce message d'aide
+    -c, --continue  Affiche l'historique des animes regardés
+    -f, --full      Active la vérification des derniers épisodes dans l'historique
+    --vf            Recherche uniquement les animes en version française (VF)
+    --debug         Active le mode debug pour plus d'informations
+    -p, --planing   Affiche le planning des animes par jour
+    -up, --upcoming Affiche les prochains épisodes à sortir
+    -t, --textual   Force l'utilisation de l'interface TUI (même comportement par défaut)
+    --cli           Force l'utilisation de l'interface en ligne de commande traditionnelle
+    -cf, --check-final  Historique avec vérification du dernier épisode
+    -w, --workers N Nombre de vérifications simultanées pour -f / -cf (défaut : 8)
+    --sort MODE     Tri de l'historique : recent, alpha ou new (nouveaux épisodes d'abord)
+    --update-index  Télécharge tout le catalogue dans l'index local de recherche
+    --no-cache      Ignore le cache HTTP local
+    --refresh       Revalide toutes les pages en cache auprès du site
+    --record DIR    Enregistre tout le trafic HTTP dans une cassette (dossier DIR)
+    --replay DIR    Rejoue une cassette hors ligne, sans accès réseau
+    --replay-latency MS  Latence simulée par requête rejouée (défaut : latence enregistrée)
+    --download      Télécharge une saison (sans recherche : reprend la file en attente)
+    --season N      Saison à télécharger avec --download
+    --episodes 1-24 Épisodes à télécharger (ex. 1-24 ou 1,3,5-8)
+    -j, --jobs N    Épisodes téléchargés en parallèle (défaut : 2)
+    --segments N    Connexions simultanées par épisode (défaut : 4)
+    --limit-rate D  Débit maximal global, ex. 500K ou 2M
+    -o, --output D  Dossier de téléchargement (défaut : ~/Downloads/anime-sama)
+    --daemon        Rafraîchit en arrière-plan les saisons de l'historique, le planning et l'index
+    --interval MIN  Minutes entre deux rafraîchissements avec --daemon (défaut : 10)
+    --budget N      Requêtes par minute au plus avec --daemon (défaut : 30)
+    --once          Avec --daemon, un seul rafraîchissement puis quitter
+    --trace FICHIER Chronomètre chaque étape (recherche, pages, episodes.js, sibnet, mpv)
+                    et l'écrit en JSON lines, ou au format Chrome si FICHIER finit par .json
+
+Information:
+    L'historique est stocké localement dans ~/.local/share/animesama-cli/history.db
+    Les pages du site sont mises en cache dans ~/.local/share/animesama-cli/http_cache.db
+    Par défaut, l'interface utilisateur Textual (TUI) est utilisée si disponible.
+
+Examples:
+    anime                  # Lance l'interface TUI (ou CLI si Textual n'est pas installé)
+    anime --cli            # Force l'utilisation de l'interface CLI traditionnelle
+    anime naruto           # Recherche directement "naruto" (dans l'interface par défaut)
+    anime --cli naruto     # Recherche "naruto" en utilisant l'interface CLI
+    anime -c               # Affiche l'historique
+    anime -cf              # Affiche l'historique avec vérification des derniers épisodes
+    anime --vf naruto      # Recherche "naruto" uniquement en VF
+    anime --debug naruto   # Recherche "naruto" avec le mode debug
+    anime -p               # Affiche le planning des animes par jour
+    anime -up              # Affiche les prochains épisodes à sortir
+    anime --update-index   # Construit ou rafraîchit l'index local du catalogue
+    anime --download naruto --season 1 --episodes 1-24  # Télécharge 24 épisodes
+    anime --download       # Reprend les téléchargements interrompus
+    anime --record /tmp/k7 --cli naruto  # Enregistre une session dans une cassette
+    anime --replay /tmp/k7 --cli naruto  # Rejoue la même session hors ligne
+    anime --trace trace.json --cli naruto  # Trace ouvrable dans chrome://tracing ou Perfetto
+    anime --daemon         # Garde l'historique et le planning à jour (voir animesama-cli.service)
+    """
+    print(help_text)
+
+def afficher_episodes_saison(url, anime_name, version):
+    episodes = load_season_episodes(url)
+    if episodes is None:
+        print("Impossible de récupérer la liste des épisodes.")
+        return
+    if not episodes:
+        print("Aucun épisode trouvé.")
+        return
+    print("\nÉpisodes :")
+    ep_keys = list(episodes.keys())
+    for i, ep in enumerate(ep_keys, 1):
+        print(f"{i}. Episode {ep}")
+    idx = input("Numéro de l'épisode à regarder : ").strip()
+    if not idx.isdigit() or int(idx) < 1 or int(idx) > len(ep_keys):
+        print("Sélection invalide.")
+        return
+    selected_ep = ep_keys[int(idx) - 1]
+    saison = version
+    url_lower = url.lower()
+    if "saison" not in version.lower():
+        match = re.search(r'/saison(\d+)', url_lower)
+        if match:
+            saison = f"Saison {match.group(1)}"
+        elif "/oav" in url_lower or "/ova" in url_lower:
+            saison = "OAV"
+        elif "/film" in url_lower:
+            saison = "Film"
+        elif "/special" in url_lower:
+            saison = "Special"
+        else:
+            saison = version
+    if "vostfr" in url.lower():
+        version_str = "VOSTFR"
+    elif re.search(r'/vf/?', url.lower()):
+        version_str = "VF"
+    else:
+        version_str = ""
+    if version_str and version_str.lower() not in saison.lower():
+        saison = f"{saison} - {version_str}"
+    watch_episodes(episodes, selected_ep, anime_name, saison, url)
+
+def cli_main(args):
+    if args.help:
+        display_help()
+        return
+    
+    if args.planing:
+        afficher_planning()
+        return
+    
+    if args.upcoming:
+        display_upcoming()
+        return
+    
+    if args.continuer or args.check_final:
+        display_history(args.full or args.check_final, workers=args.workers, sort=args.sort)
+        return
+    
+    if not args.query:
+        print("\nAnime-sama CLI (inspiré de ani-cli)")
+        print("1. Recherche d'anime")
+        print("2. Historique")
+        print("3. Planning")
+        print("4. À venir")
+        print("5. Quitter")
+        choix = input("Choix : ").strip()
+        if choix == "1":
+            query = input("Recherche : ").strip()
+            if not query:
+                print("Aucune recherche.")
+                return
+            args.query = [query]
+        elif choix == "2":
+            display_history(False, sort=args.sort)
+            return
+        elif choix == "3":
+            afficher_planning()
+            return
+        elif choix == "4":
+            display_upcoming()
+            return
+        else:
+            print("Bye !")
+            return
+    
+    query = " ".join(args.query)
+    print(f"🔍 Recherche de : {query}")
+    downloader = AnimeDownloader(debug=args.debug)
+    animes, urls = search_catalogue(query, vf=args.vf, debug=args.debug)
+    
+    if not animes:
+        print("Aucun anime trouvé.")
+        return
+    
+    print("\nRésultats :")
+    for i, anime in enumerate(animes, 1):
+        print(f"{i}. {anime}")
+    
+    idx = input("Numéro de l'anime à sélectionner : ").strip()
+    if not idx.isdigit() or int(idx) < 1 or int(idx) > len(animes):
+        print("Sélection invalide.")
+        return
+    
+    selected_anime = int(idx) - 1
+    anime_url = urls[selected_anime]
+    print(f"URL de l'anime : {anime_url}")
+    seasons = load_show_seasons(anime_url)
+    
+    if not seasons:
+        print("Aucune saison trouvée.")
+        return
+    
+    print("\nSaisons :")
+    for i, season in enumerate(seasons, 1):
+        print(f"{i}. {season['name']}")
+    
+    idx = input("Numéro de la saison à sélectionner : ").strip()
+    if not idx.isdigit() or int(idx) < 1 or int(idx) > len(seasons):
+        print("Sélection invalide.")
+        return
+    
+    selected_season = int(idx) - 1
+    season_url = anime_url.rstrip('/') + '/' + seasons[selected_season]['url'].lstrip('/')
+    if args.vf:
+        season_url = season_url.replace("vostfr", "vf")
+        print(f"URL corrigée pour la VF : {season_url}")
+    
+    print(f"URL de la saison : {season_url}")
+    episodes = load_season_episodes(season_url, downloader)
+    if episodes is None:
+        print("Impossible de récupérer la liste des épisodes.")
+        return
+    
+    if not episodes:
+        print("Aucun épisode trouvé.")
+        return
+    
+    print("\nÉpisodes :")
+    ep_keys = list(episodes.keys())
+    for i, ep in enumerate(ep_keys, 1):
+        print(f"{i}. Episode {ep}")
+    
+    idx = input("Numéro de l'épisode à regarder : ").strip()
+    if not idx.isdigit() or int(idx) < 1 or int(idx) > len(ep_keys):
+        print("Sélection invalide.")
+        return
+    
+    selected_ep = ep_keys[int(idx) - 1]
+    saison = format_saison(seasons[selected_season]['name'], season_url)
+    watch_episodes(episodes, selected_ep, animes[selected_anime], saison, season_url, debug=args.debug)
+
+def tui_main(args):
+    from anime_sama_tui import tui_main as run_tui
+    run_tui(args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Anime-sama CLI - Interface CLI et TUI pour anime-sama.fr",
+        add_help=False
+    )
+    parser.add_argument("query", nargs="*", help="Recherche d'anime")
+    parser.add_argument("-c", "--continuer", action="store_true", help="Afficher l'historique")
+    parser.add_argument("-f", "--full", action="store_true", help="Vérification des derniers épisodes dans l'historique")
+    parser.add_argument("--vf", action="store_true", help="Recherche uniquement en VF")
+    parser.add_argument("--debug", action="store_true", help="Mode debug")
+    parser.add_argument("-h", "--help", action="store_true", help="Afficher l'aide")
+    parser.add_argument("-p", "--planing", action="store_true", help="Afficher le planning")
+    parser.add_argument("-up", "--upcoming", action="store_true", help="Afficher les prochains épisodes à sortir")
+    parser.add_argument("-t", "--textual", action="store_true", help="Utiliser l'interface TUI (Textual)")
+    parser.add_argument("--cli", action="store_true", help="Utiliser l'interface en ligne de commande traditionnelle")
+    parser.add_argument("-cf", "--check-final", action="store_true", help="Historique avec vérification du dernier épisode")
+    parser.add_argument("--update-index", action="store_true", help="Mettre à jour l'index local du catalogue")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache HTTP local")
+    parser.add_argument("--refresh", action="store_true", help="Revalider toutes les pages en cache")
+    parser.add_argument("-w", "--workers", type=int, default=HISTORY_CHECK_WORKERS, help="Nombre de vérifications simultanées pour -f / -cf")
+    parser.add_argument("--sort", choices=list(HISTORY_SORTS), default="recent", help="Tri de l'historique")
+    parser.add_argument("--record", metavar="DOSSIER", help="Enregistrer tout le trafic HTTP dans une cassette")
+    parser.add_argument("--replay", metavar="DOSSIER", help="Rejouer une cassette sans accès réseau")
+    parser.add_argument("--replay-latency", type=float, metavar="MS", help="Latence simulée par requête rejouée (défaut : latence enregistrée)")
+    parser.add_argument("--download", action="store_true", help="Télécharger une saison (ou reprendre la file de téléchargement)")
+    parser.add_argument("--season", type=int, metavar="N", help="Numéro de la saison à télécharger")
+    parser.add_argument("--episodes", metavar="PLAGE", help="Épisodes à télécharger, ex. 1-24 ou 1,3,5-8")
+    parser.add_argument("-j", "--jobs", type=int, default=DOWNLOAD_JOBS, help="Nombre d'épisodes téléchargés en parallèle")
+    parser.add_argument("--segments", type=int, default=DOWNLOAD_SEGMENTS, metavar="N", help="Connexions simultanées par épisode")
+    parser.add_argument("--limit-rate", type=parse_rate, default=0, metavar="DÉBIT", help="Débit maximal global, ex. 500K ou 2M")
+    parser.add_argument("-o", "--output", metavar="DOSSIER", help="Dossier de téléchargement")
+    parser.add_argument("--daemon", action="store_true", help="Rafraîchir en arrière-plan l'historique, le planning et l'index")
+    parser.add_argument("--interval", type=float, default=DAEMON_INTERVAL / 60, metavar="MIN", help="Minutes entre deux rafraîchissements avec --daemon")
+    parser.add_argument("--budget", type=int, default=DAEMON_REQUESTS_PER_MINUTE, metavar="N", help="Requêtes par minute au plus avec --daemon")
+    parser.add_argument("--once", action="store_true", help="Avec --daemon : un seul rafraîchissement puis quitter")
+    parser.add_argument("--trace", metavar="FICHIER", help="Écrire les étapes chronométrées (JSON lines, ou format Chrome si .json)")
+    
+    args = parser.parse_args()
+    
+    if args.record or args.replay:
+        try:
+            if args.record:
+                set_cassette(Cassette(args.record, "record"))
+            else:
+                latency = args.replay_latency / 1000 if args.replay_latency is not None else None
+                set_cassette(Cassette(args.replay, "replay", latency))
+        except OSError as e:
+            print(f"Erreur : impossible d'ouvrir la cassette : {e}")
+            return
+        atexit.register(print_cassette_report)
+    if args.trace:
+        set_tracer(Tracer(args.trace))
+        atexit.register(print_trace_summary)
+    set_client_pool_size(max(HTTP_POOL_SIZE, args.workers, args.jobs * args.segments))
+    if args.debug:
+        atexit.register(print_connection_stats)
+    if args.no_cache or HTTP_CASSETTE:
+        set_cache_mode("off")
+    elif args.refresh:
+        set_cache_mode("refresh")
+    
+    if args.help:
+        display_help()
+        return
+    
+    if args.update_index:
+        update_catalogue_index(debug=args.debug)
+        return
+    
+    if args.daemon:
+        daemon_main(args)
+        return
+    
+    if args.download:
+        try:
+            download_main(args)
+        except ValueError as e:
+            print(f"Erreur : {e}")
+        except KeyboardInterrupt:
+            print("\nProgramme interrompu par l'utilisateur")
+        return
+    
+    use_tui = not args.cli and TEXTUAL_AVAILABLE
+    
+    if args.textual and not TEXTUAL_AVAILABLE:
+        print("Erreur: La librairie Textual n'est pas installée. Impossible d'utiliser le mode TUI.")
+        print("Installez-la avec: pip install textual")
+        print("Passage en mode CLI...")
+        use_tui = False
+    
+    if use_tui:
+        tui_main(args)
+    else:
+        try:
+            cli_main(args)
+        except KeyboardInterrupt:
+            print("\nProgramme interrompu par l'utilisateur")
+        except Exception as e:
+            print(f"\nUne erreur s'est produite : {str(e)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import threading
+import time
+from http.client import responses as HTTP_REASONS
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+import anime_sama as core
+
+CONNECTION_STATS = {"requests": 0, "opened": 0}
+_connection_stats_lock = threading.Lock()
+
+_connection_local = threading.local()
+
+def count_connection_stat(key):
+    with _connection_stats_lock:
+        CONNECTION_STATS[key] += 1
+    if key == "opened":
+        _connection_local.opened = getattr(_connection_local, "opened", 0) + 1
+
+class CachingAdapter(HTTPAdapter):
+    def send(self, request, **kwargs):
+        ttl = core.get_cache_ttl(request.url)
+        if (core.HTTP_CACHE_MODE == "off" or ttl is None or request.method != "GET"
+                or "range" in request.headers):
+            return self._network_send(request, **kwargs)
+        cache = core.get_http_cache()
+        entry = cache.get(request.url)
+        if entry and core.HTTP_CACHE_MODE != "refresh" and entry["expires_at"] > time.time():
+            return self._cached_response(request, entry)
+        if entry:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._network_send(request, **kwargs)
+        if response.status_code == 304 and entry:
+            cache.refresh(request.url, ttl)
+            cached = self._cached_response(request, entry)
+            cached.revalidated = True
+            cached.connection_reused = getattr(response, "connection_reused", None)
+            return cached
+        if response.status_code == 200:
+            cache.put(request.url, response.status_code, response.headers, response.content, ttl)
+        return response
+
+    def _network_send(self, request, **kwargs):
+        return super().send(request, **kwargs)
+
+    def _cached_response(self, request, entry):
+        response = build_response(request, entry["status"], entry["headers"], entry["body"])
+        response.from_cache = True
+        return response
+
+def build_response(request, status, headers, body):
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response._content_consumed = True
+    response.url = request.url
+    response.request = request
+    response.reason = HTTP_REASONS.get(status, "")
+    return response
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        count_connection_stat("opened")
+        return super()._new_conn()
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        count_connection_stat("opened")
+        return super()._new_conn()
+
+class PooledAdapter(CachingAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool
+        }
+
+    def _network_send(self, request, **kwargs):
+        if core.REQUEST_BUDGET:
+            core.REQUEST_BUDGET.consume(1)
+        count_connection_stat("requests")
+        opened = getattr(_connection_local, "opened", 0)
+        response = super()._network_send(request, **kwargs)
+        response.connection_reused = getattr(_connection_local, "opened", 0) == opened
+        return response
+
+class CassetteTee:
+    def __init__(self, raw, on_finish, limit=core.CASSETTE_STREAM_PREFIX):
+        self.raw = raw
+        self.on_finish = on_finish
+        self.limit = limit
+        self.captured = bytearray()
+        self.finished = False
+
+    def capture(self, data):
+        if len(self.captured) < self.limit:
+            self.captured += data[:self.limit - len(self.captured)]
+        return data
+
+    def read(self, *args, **kwargs):
+        return self.capture(self.raw.read(*args, **kwargs))
+
+    def stream(self, *args, **kwargs):
+        for chunk in self.raw.stream(*args, **kwargs):
+            yield self.capture(chunk)
+        self.finish()
+
+    def finish(self):
+        if not self.finished:
+            self.finished = True
+            self.on_finish(bytes(self.captured))
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
+
+class CassetteAdapter(PooledAdapter):
+    def _network_send(self, request, **kwargs):
+        if core.HTTP_CASSETTE.mode == "replay":
+            return core.HTTP_CASSETTE.replay(request)
+        start = time.perf_counter()
+        response = super()._network_send(request, **kwargs)
+        elapsed = time.perf_counter() - start
+        if not kwargs.get("stream"):
+            core.HTTP_CASSETTE.record(request, response, elapsed)
+            return response
+        tee = CassetteTee(response.raw, lambda body: core.HTTP_CASSETTE.record(request, response, elapsed, body))
+        response.raw = tee
+        close = response.close
+        def close_and_record():
+            tee.finish()
+            close()
+        response.close = close_and_record
+        return response
+
+class HttpClient:
+    def __init__(self, pool_size=core.HTTP_POOL_SIZE):
+        self.session = requests.Session()
+        self.session.headers.update(core.HEADERS_BASE)
+        adapter_class = CassetteAdapter if core.HTTP_CASSETTE else PooledAdapter
+        adapter = adapter_class(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def headers_for(self, url, headers=None):
+        host = urlsplit(url).hostname or ""
+        profile = dict(core.HEADER_PROFILES.get(host, {}))
+        if headers:
+            profile.update(headers)
+        return profile
+
+    def get(self, url, headers=None, **kwargs):
+        if core.TRACER is None:
+            return self.session.get(url, headers=self.headers_for(url, headers), **kwargs)
+        with core.TRACER.span(core.trace_stage(url), url=url) as span:
+            response = self.session.get(url, headers=self.headers_for(url, headers), **kwargs)
+            core.trace_response(span, response, kwargs.get("stream", False))
+            return response
+
+    def stats(self):
+        with _connection_stats_lock:
+            sent = CONNECTION_STATS["requests"]
+            opened = CONNECTION_STATS["opened"]
+        return {"requests": sent, "opened": opened, "reused": max(0, sent - opened)}
@@ -0,0 +1,886 @@
+import asyncio
+import re
+import subprocess
+import time
+from functools import partial
+
+import requests
+from textual.app import App, ComposeResult
+from textual.widgets import Header, Footer, Button, Static, ListView, ListItem, Label, Input
+from textual.containers import Container
+from textual.reactive import reactive
+from textual.message import Message
+from textual.screen import Screen
+from textual.worker import get_current_worker
+
+from anime_sama import (
+    DOWNLOAD_PROGRESS_INTERVAL, HISTORY_CHECK_WORKERS, HISTORY_PAGE_PREFETCH, HISTORY_SORT_LABELS, HISTORY_SORTS,
+    MENU_ITEMS, SEARCH_DEBOUNCE, SEARCH_MIN_LENGTH, AnimeDownloader, MpvError, PlaybackSession,
+    delete_history_entry, episode_mirrors, format_history_entry, format_job_progress, format_planning_day,
+    format_planning_entry, format_saison, format_upcoming_entry, get_catalogue_index, get_download_queue,
+    get_download_scheduler, get_history_entries, get_history_entry, get_history_page, get_planning, get_prefetcher,
+    get_upcoming, history_new_episodes, load_season_episodes, load_show_seasons, mpv_start_args,
+    next_episode_key, resolve_upcoming, resume_point, revalidate_history, trace_span,
+)
+
+class MenuSelect(Message):
+    def __init__(self, sender, index):
+        super().__init__()
+        self.sender = sender
+        self.index = index
+
+class MainMenu(Static):
+    def compose(self) -> ComposeResult:
+        yield Label("Anime-sama CLI (Textual)", id="title")
+        items = [ListItem(Label(text)) for text, _ in MENU_ITEMS]
+        self.list_view = ListView(*items, id="menu-list")
+        yield self.list_view
+
+    def on_mount(self):
+        self.list_view.index = 0
+
+    def on_list_view_selected(self, event):
+        self.app.post_message(MenuSelect(self, self.list_view.index))
+
+def launch_mpv(video_url, start=0):
+    with trace_span("mpv (lancement)"):
+        return subprocess.Popen(
+            ['mpv', video_url, '--fullscreen', *mpv_start_args(start)],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+def play_with_mpv(episodes, ep, anime_name, saison, url, set_status, on_recorded, start=0):
+    session = PlaybackSession(
+        episodes, ep, anime_name, saison, url, log=set_status, on_recorded=on_recorded, verbose=False,
+        start=start
+    )
+    try:
+        session.run()
+        return
+    except FileNotFoundError:
+        set_status("Erreur : mpv n'est pas installé.")
+        return
+    except MpvError:
+        pass
+    prefetcher = get_prefetcher()
+    set_status(f"Récupération de l'épisode {ep}...")
+    video_url = prefetcher.resolve(episodes[ep], verbose=False, mirrors=episode_mirrors(url, ep))
+    if not video_url:
+        set_status("Impossible de récupérer l'URL de la vidéo.")
+        return
+    following_ep = next_episode_key(episodes, ep)
+    if following_ep:
+        prefetcher.prefetch(episodes[following_ep], episode_mirrors(url, following_ep))
+    set_status(f"Lecture de l'épisode {ep} avec mpv...")
+    try:
+        returncode = launch_mpv(video_url, start).wait()
+    except FileNotFoundError:
+        set_status("Erreur : mpv n'est pas installé.")
+        return
+    if returncode != 0:
+        set_status(f"Erreur lors de la lecture : mpv a quitté avec le code {returncode}")
+        return
+    session.record(ep)
+
+class HistoryScreen(Screen):
+    def __init__(self, sort="recent"):
+        super().__init__()
+        self.sort = sort
+        self.filter_text = ""
+        self.entries = []
+        self.labels = []
+        self.cursor = None
+        self.playing = False
+
+    def compose(self) -> ComposeResult:
+        self.title_label = Label(self.title_text(), id="history-title")
+        yield self.title_label
+        self.filter_input = Input(placeholder="Filtrer par nom...", id="history-filter")
+        yield self.filter_input
+        self.list_view = ListView(id="history-list")
+        yield self.list_view
+        self.empty_label = Label("", id="history-empty")
+        yield self.empty_label
+        self.status_label = Label(
+            "Entrée: relire l'épisode suivant, d: supprimer, /: filtrer, s: changer le tri, q: retour menu",
+            id="history-help"
+        )
+        yield self.status_label
+
+    def title_text(self):
+        return f"Historique (tri : {HISTORY_SORT_LABELS[self.sort]}) :"
+
+    async def on_mount(self):
+        await self.reload()
+        self.set_focus(self.list_view)
+
+    async def reload(self):
+        await self.list_view.clear()
+        self.entries, self.labels, self.cursor = [], [], None
+        await self.load_page()
+        if self.entries:
+            self.empty_label.update("")
+            self.list_view.index = 0
+        else:
+            self.empty_label.update("Aucun résultat." if self.filter_text else "Aucun historique trouvé.")
+
+    async def load_page(self):
+        entries, self.cursor = get_history_page(self.cursor, self.filter_text, self.sort)
+        labels = [Label(format_history_entry(entry)) for entry in entries]
+        self.entries += entries
+        self.labels += labels
+        await self.list_view.extend(ListItem(label) for label in labels)
+
+    async def on_list_view_highlighted(self, event):
+        if event.control is not self.list_view or self.cursor is None or self.list_view.index is None:
+            return
+        if self.list_view.index >= len(self.entries) - HISTORY_PAGE_PREFETCH:
+            await self.load_page()
+
+    async def on_input_changed(self, event: Input.Changed):
+        if event.input is self.filter_input and event.value.strip() != self.filter_text:
+            self.filter_text = event.value.strip()
+            await self.reload()
+
+    def on_input_submitted(self, event: Input.Submitted):
+        if event.input is self.filter_input:
+            self.set_focus(self.list_view)
+
+    async def key_s(self):
+        sorts = list(HISTORY_SORTS)
+        self.sort = sorts[(sorts.index(self.sort) + 1) % len(sorts)]
+        self.title_label.update(self.title_text())
+        await self.reload()
+
+    def key_slash(self):
+        self.set_focus(self.filter_input)
+
+    def on_list_view_selected(self, event):
+        if event.control is self.list_view:
+            idx = self.list_view.index
+            if idx is None or idx < 0 or idx >= len(self.entries):
+                return
+            if self.playing:
+                self.status_label.update("Une lecture est déjà en cours.")
+                return
+            self.playing = True
+            self.status_label.update("Récupération de la liste des épisodes...")
+            self.run_worker(partial(self.play_next_episode, self.entries[idx]), thread=True, exit_on_error=False)
+
+    def set_status(self, text):
+        self.app.call_from_thread(self.status_label.update, text)
+
+    def play_next_episode(self, entry):
+        try:
+            self._play_next_episode(entry)
+        finally:
+            self.playing = False
+
+    def _play_next_episode(self, entry):
+        entry_id, anime_name, episode, saison, url = entry[:5]
+        if not re.search(r'(\d+)$', episode):
+            self.set_status("Impossible de déterminer l'épisode courant.")
+            return
+        episodes = load_season_episodes(url)
+        if episodes is None:
+            self.set_status("Impossible de récupérer la liste des épisodes.")
+            return
+        if not episodes:
+            self.set_status("Aucun épisode trouvé.")
+            return
+        next_ep, start = resume_point(episodes, entry)
+        if next_ep is None:
+            self.set_status("Déjà au dernier épisode.")
+            return
+        saison_str = saison
+        if "vostfr" in url.lower():
+            version_str = "VOSTFR"
+        elif "/vf" in url.lower():
+            version_str = "VF"
+        else:
+            version_str = ""
+        if version_str and version_str.lower() not in saison_str.lower():
+            saison_str = f"{saison_str} - {version_str}"
+        play_with_mpv(
+            episodes, next_ep, anime_name, saison_str, url, self.set_status,
+            lambda ep: self.app.call_from_thread(self.entry_played, entry_id, f"Lecture terminée : Episode {ep}."),
+            start=start
+        )
+        self.app.call_from_thread(self.entry_played, entry_id)
+
+    def entry_played(self, entry_id, status=None):
+        updated = get_history_entry(entry_id)
+        for i, entry in enumerate(self.entries):
+            if updated and entry[0] == entry_id:
+                self.entries[i] = updated
+                self.labels[i].update(format_history_entry(updated))
+        if status:
+            self.status_label.update(status)
+
+    def key_q(self):
+        self.app.pop_screen()
+
+    def key_d(self):
+        self._delete_selected_entry()
+
+    def key_delete(self):
+        self._delete_selected_entry()
+
+    def key_escape(self):
+        if self.focused is self.filter_input:
+            self.set_focus(self.list_view)
+            return
+        self.key_q()
+
+    def _delete_selected_entry(self):
+        idx = self.list_view.index
+        if idx is None or idx < 0 or idx >= len(self.entries):
+            return
+        entry_id = self.entries[idx][0]
+        delete_history_entry(entry_id)
+        del self.entries[idx]
+        del self.labels[idx]
+        self.list_view.children[idx].remove()
+        if not self.entries:
+            self.empty_label.update("Aucun historique trouvé.")
+
+class HistoryCheckFinalScreen(Screen):
+    def __init__(self, workers=HISTORY_CHECK_WORKERS):
+        super().__init__()
+        self.max_workers = workers
+
+    def compose(self) -> ComposeResult:
+        yield Label("Historique (dernier épisode en rouge) :", id="history-title")
+        self.entries = get_history_entries()
+        if not self.entries:
+            yield Label("Aucun historique trouvé.", id="history-empty")
+            return
+        self.labels = []
+        self.last_ep_indices = set()
+        for i, entry in enumerate(self.entries):
+            self.labels.append(Label(self.entry_label(i, entry)))
+        self.list_view = ListView(*[ListItem(label) for label in self.labels], id="history-list")
+        yield self.list_view
+        self.status_label = Label(f"Vérification de {len(self.entries)} anime(s)...", id="history-status")
+        yield self.status_label
+        yield Label("Entrée: relire l'épisode suivant, d: supprimer, q: retour menu", id="history-help")
+
+    def entry_label(self, idx, entry):
+        if history_new_episodes(entry) == 0:
+            self.last_ep_indices.add(idx)
+            return f"[red]{format_history_entry(entry)}[/red]"
+        self.last_ep_indices.discard(idx)
+        return format_history_entry(entry)
+
+    def check_entries(self):
+        done = 0
+        for idx, entry in revalidate_history(self.entries, self.max_workers):
+            done += 1
+            self.app.call_from_thread(self.mark_entry, idx, entry, done)
+
+    def mark_entry(self, idx, entry, done):
+        if entry != self.entries[idx]:
+            self.entries[idx] = entry
+            self.labels[idx].update(self.entry_label(idx, entry))
+        if done == len(self.entries):
+            self.status_label.update("Vérification terminée.")
+        else:
+            self.status_label.update(f"Vérification : {done}/{len(self.entries)}")
+
+    def on_mount(self):
+        if hasattr(self, "list_view"):
+            self.list_view.index = 0
+            self.set_focus(self.list_view)
+            self.run_worker(self.check_entries, thread=True, exit_on_error=False)
+
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+        
+class PlanningScreen(Screen):
+    def compose(self) -> ComposeResult:
+        yield Label("Planning des animes :", id="planning-title")
+        self.days, self.planning = [], {}
+        self.anime_list = None
+        self.loading_label = Label("Chargement du planning...", id="planning-loading")
+        yield self.loading_label
+        yield Label("Entrée: voir les animes du jour, q: retour menu", id="planning-help")
+
+    def load_planning(self):
+        days, planning = self.get_planning()
+        self.app.call_from_thread(self.show_planning, days, planning)
+
+    def show_planning(self, days, planning):
+        self.days, self.planning = days, planning
+        if not self.days:
+            self.loading_label.update("Aucun planning trouvé.")
+            return
+        self.loading_label.remove()
+        items = [ListItem(Label(format_planning_day(day, self.planning[day]), markup=False)) for day in self.days]
+        self.day_list = ListView(*items, id="planning-day-list")
+        self.mount(self.day_list, before="#planning-help")
+        self.day_list.index = 0
+        self.set_focus(self.day_list)
+
+    def get_planning(self):
+        try:
+            return get_planning()
+        except requests.RequestException:
+            return [], {}
+
+    def on_mount(self):
+        self.run_worker(self.load_planning, thread=True, exit_on_error=False)
+
+    def on_list_view_selected(self, event):
+        if hasattr(self, "day_list") and event.control is self.day_list:
+            idx = self.day_list.index
+            if idx < 0 or idx >= len(self.days):
+                return
+            selected_day = self.days[idx]
+            animes = self.planning[selected_day]
+            if self.anime_list:
+                self.anime_list.remove()
+            if not animes:
+                self.anime_list = ListView(ListItem(Label("Aucun anime ce jour.")), id="anime-list")
+            else:
+                items = [ListItem(Label(format_planning_entry(entry), markup=False)) for entry in animes]
+                self.anime_list = ListView(*items, id="anime-list")
+            self.mount(self.anime_list)
+            self.set_focus(self.anime_list)
+        elif hasattr(self, "anime_list") and event.control is self.anime_list:
+            idx = self.anime_list.index
+            day_idx = self.day_list.index
+            if day_idx < 0 or day_idx >= len(self.days):
+                return
+            selected_day = self.days[day_idx]
+            animes = self.planning[selected_day]
+            if idx < 0 or idx >= len(animes):
+                return
+            entry = animes[idx]
+            season_url = f"https://anime-sama.fr/catalogue/{entry.slug}"
+            saison_name = f"{entry.time} - {entry.version}" if entry.time or entry.version else entry.version
+            self.app.push_screen(EpisodesScreen(entry.title, saison_name, season_url))
+
+    def key_q(self):
+        if hasattr(self, "anime_list") and self.anime_list in self.children:
+            self.anime_list.remove()
+            self.set_focus(self.day_list)
+        else:
+            self.app.pop_screen()
+
+    def key_escape(self):
+        self.key_q()
+
+class UpcomingScreen(Screen):
+    def compose(self) -> ComposeResult:
+        yield Label("Prochains épisodes (✓ : disponible sur anime-sama) :", id="upcoming-title")
+        self.entries = []
+        self.labels = []
+        self.opening = False
+        self.loading_label = Label("Chargement des prochains épisodes...", id="upcoming-loading")
+        yield self.loading_label
+        self.status_label = Label("Entrée: ouvrir l'anime, q ou Échap : retour menu", id="upcoming-help")
+        yield self.status_label
+
+    def on_mount(self):
+        self.run_worker(self.load_upcoming, thread=True, exit_on_error=False)
+
+    def load_upcoming(self):
+        try:
+            entries = get_upcoming()
+        except requests.RequestException as e:
+            self.app.call_from_thread(self.loading_label.update, f"Erreur lors du chargement : {e}")
+            return
+        self.app.call_from_thread(self.show_upcoming, entries)
+
+    def show_upcoming(self, entries):
+        self.entries = entries
+        if not entries:
+            self.loading_label.update("Aucun épisode à venir trouvé.")
+            return
+        self.loading_label.remove()
+        self.labels = [Label(format_upcoming_entry(entry), markup=False) for entry in entries]
+        self.list_view = ListView(*[ListItem(label) for label in self.labels], id="upcoming-list")
+        self.mount(self.list_view, before=self.status_label)
+        self.list_view.index = 0
+        self.set_focus(self.list_view)
+        self.set_interval(1, self.tick)
+
+    def tick(self):
+        now = time.time()
+        for entry, label in zip(self.entries, self.labels):
+            label.update(format_upcoming_entry(entry, now))
+
+    def on_list_view_selected(self, event):
+        if hasattr(self, "list_view") and event.control is self.list_view:
+            idx = self.list_view.index
+            if idx is None or idx < 0 or idx >= len(self.entries) or self.opening:
+                return
+            self.opening = True
+            self.status_label.update(f"Recherche de {self.entries[idx].title} sur anime-sama...")
+            self.run_worker(partial(self.open_entry, self.entries[idx]), thread=True, exit_on_error=False)
+
+    def open_entry(self, entry):
+        try:
+            match = resolve_upcoming(entry)
+        except requests.RequestException:
+            match = None
+        finally:
+            self.opening = False
+        if not match:
+            self.app.call_from_thread(self.status_label.update, "Anime introuvable sur anime-sama.")
+            return
+        self.app.call_from_thread(self.status_label.update, "Entrée: ouvrir l'anime, q ou Échap : retour menu")
+        self.app.call_from_thread(self.app.push_screen, AnimeInfoScreen(*match))
+
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+class EpisodesScreen(Screen):
+    def __init__(self, anime_name, season_name, season_url):
+        super().__init__()
+        self.anime_name = anime_name
+        self.season_name = season_name
+        self.season_url = season_url
+        self.episodes = []
+        self.episodes_dict = {}
+        self.status_label = None
+        self.playing = False
+    def compose(self) -> ComposeResult:
+        yield Label(f"{self.anime_name} - {self.season_name}", id="episodes-title")
+        self.loading_label = Label("Chargement des épisodes...", id="episodes-loading")
+        yield self.loading_label
+        self.status_label = Label("Entrée: lancer l'épisode avec mpv, t: télécharger l'épisode, a: télécharger la saison, q ou Échap : retour", id="episodes-help")
+        yield self.status_label
+    def get_episodes(self):
+        return load_season_episodes(self.season_url) or {}
+    def load_episodes(self):
+        episodes = self.get_episodes()
+        self.app.call_from_thread(self.show_episodes, episodes)
+    def show_episodes(self, episodes):
+        self.episodes_dict = episodes
+        if not self.episodes_dict:
+            self.loading_label.update("Aucun épisode trouvé.")
+            return
+        self.loading_label.remove()
+        items = [ListItem(Label(f"Episode {ep}")) for ep in self.episodes_dict.keys()]
+        self.episode_list = ListView(*items, id="episode-list")
+        self.mount(self.episode_list, before=self.status_label)
+        self.episode_list.index = 0
+        self.set_focus(self.episode_list)
+    def on_mount(self):
+        self.run_worker(self.load_episodes, thread=True, exit_on_error=False)
+    def on_list_view_selected(self, event):
+        if hasattr(self, "episode_list") and event.control is self.episode_list:
+            idx = self.episode_list.index
+            ep_keys = list(self.episodes_dict.keys())
+            if idx is not None and 0 <= idx < len(ep_keys):
+                if self.playing:
+                    self.status_label.update("Une lecture est déjà en cours.")
+                    return
+                self.playing = True
+                self.status_label.update(f"Récupération de l'épisode {ep_keys[idx]}...")
+                self.run_worker(partial(self.play_episode, idx), thread=True, exit_on_error=False)
+    def set_status(self, text):
+        self.app.call_from_thread(self.status_label.update, text)
+    def play_episode(self, idx):
+        try:
+            self._play_episode(idx)
+        finally:
+            self.playing = False
+    def _play_episode(self, idx):
+        ep = list(self.episodes_dict.keys())[idx]
+        saison = self.season_name
+        if "vostfr" in self.season_url.lower():
+            version_str = "VOSTFR"
+        elif "/vf" in self.season_url.lower():
+            version_str = "VF"
+        else:
+            version_str = ""
+        if version_str and version_str.lower() not in saison.lower():
+            saison = f"{saison} - {version_str}"
+        play_with_mpv(
+            self.episodes_dict, ep, self.anime_name, saison, self.season_url, self.set_status,
+            lambda played: self.set_status(f"Lecture de l'épisode {played} terminée.")
+        )
+    def enqueue_download(self, episodes):
+        get_download_queue().enqueue(
+            self.anime_name, format_saison(self.season_name, self.season_url), self.season_url, episodes
+        )
+        start_downloads(self.app)
+        self.status_label.update(f"{len(episodes)} épisode(s) ajouté(s) aux téléchargements.")
+    def key_t(self):
+        if not hasattr(self, "episode_list") or self.episode_list.index is None:
+            return
+        ep = list(self.episodes_dict.keys())[self.episode_list.index]
+        self.enqueue_download({ep: self.episodes_dict[ep]})
+    def key_a(self):
+        if self.episodes_dict:
+            self.enqueue_download(self.episodes_dict)
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+def start_downloads(app):
+    scheduler = get_download_scheduler()
+    if not scheduler.running:
+        scheduler.running = True
+        app.run_worker(scheduler.run, thread=True, exit_on_error=False, group="downloads")
+
+class DownloadsScreen(Screen):
+    def compose(self) -> ComposeResult:
+        yield Label("Téléchargements :", id="downloads-title")
+        self.job_ids = []
+        self.labels = []
+        self.list_view = ListView(id="downloads-list")
+        yield self.list_view
+        self.status_label = Label("", id="downloads-status")
+        yield self.status_label
+        yield Label("r: lancer ou reprendre la file, c: retirer les terminés, q ou Échap : retour", id="downloads-help")
+
+    def on_mount(self):
+        self.refresh_jobs()
+        self.set_interval(DOWNLOAD_PROGRESS_INTERVAL, self.refresh_jobs)
+        self.set_focus(self.list_view)
+
+    def refresh_jobs(self):
+        scheduler = get_download_scheduler()
+        active = dict(scheduler.active)
+        jobs = [active.get(job["id"], job) for job in get_download_queue().jobs()]
+        if [job["id"] for job in jobs] != self.job_ids:
+            self.job_ids = [job["id"] for job in jobs]
+            self.labels = [Label(format_job_progress(job)) for job in jobs]
+            self.list_view.clear()
+            for label in self.labels:
+                self.list_view.append(ListItem(label))
+        else:
+            for label, job in zip(self.labels, jobs):
+                label.update(format_job_progress(job))
+        counts = {status: sum(1 for job in jobs if job["status"] == status)
+                  for status in ("running", "pending", "done", "failed")}
+        if not jobs:
+            self.status_label.update("Aucun téléchargement. Ajoutez des épisodes avec t ou a depuis la liste des épisodes.")
+            return
+        state = "en cours" if scheduler.running else "en pause"
+        self.status_label.update(
+            f"File {state} : {counts['running']} en cours, {counts['pending']} en attente, "
+            f"{counts['done']} terminé(s), {counts['failed']} en échec"
+        )
+
+    def key_r(self):
+        start_downloads(self.app)
+        self.refresh_jobs()
+
+    def key_c(self):
+        get_download_queue().clear_finished()
+        self.refresh_jobs()
+
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+class VersionSelectScreen(Screen):
+    def __init__(self, anime_name, anime_url, versions):
+        super().__init__()
+        self.anime_name = anime_name
+        self.anime_url = anime_url
+        self.versions = versions
+
+    def compose(self) -> ComposeResult:
+        yield Label(f"Sélectionnez la version pour : {self.anime_name}", id="version-title")
+        items = [ListItem(Label(label)) for label, url in self.versions]
+        self.version_list = ListView(*items, id="version-list")
+        yield self.version_list
+        yield Label("Entrée: valider, q ou Échap: retour", id="version-help")
+
+    def on_mount(self):
+        self.version_list.index = 0
+        self.set_focus(self.version_list)
+
+    def on_list_view_selected(self, event):
+        idx = self.version_list.index
+        if 0 <= idx < len(self.versions):
+            label, url = self.versions[idx]
+            self.app.push_screen(AnimeInfoScreen(self.anime_name, url))
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+class AnimeInfoScreen(Screen):
+    def __init__(self, anime_name, anime_url):
+        super().__init__()
+        self.anime_name = anime_name
+        self.anime_url = anime_url
+        self.seasons = []
+    def compose(self) -> ComposeResult:
+        yield Label(f"Anime sélectionné : {self.anime_name}", id="anime-info-title")
+        yield Label(f"URL : {self.anime_url}", id="anime-info-url")
+        self.loading_label = Label("Chargement des saisons...", id="anime-info-loading")
+        yield self.loading_label
+    def get_seasons(self):
+        return load_show_seasons(self.anime_url)
+    def load_seasons(self):
+        seasons = self.get_seasons()
+        self.app.call_from_thread(self.show_seasons, seasons)
+    def show_seasons(self, seasons):
+        versions = {}
+        for season in seasons:
+            url = season['url'].lower()
+            if 'vostfr' in url:
+                versions.setdefault('VOSTFR', []).append(season)
+            elif 'vf' in url:
+                versions.setdefault('VF', []).append(season)
+            else:
+                versions.setdefault('AUTRE', []).append(season)
+
+        main_versions = [v for v in versions if v in ("VOSTFR", "VF")]
+        if len(main_versions) > 1:
+            version_choices = []
+            for label in main_versions:
+                version_url = self.anime_url.rstrip('/') + '/' + versions[label][0]['url'].split('/')[0] + '/' + label.lower()
+                version_choices.append((label, version_url))
+            self.app.switch_screen(VersionSelectScreen(self.anime_name, self.anime_url, version_choices))
+            return
+
+        if len(versions) == 1:
+            label = list(versions.keys())[0]
+            self.mount(Label(f"Version : {label}", id="anime-version"), before="#anime-info-title")
+
+        self.seasons = seasons
+        if not self.seasons:
+            self.loading_label.update("Aucune saison trouvée.")
+            return
+        self.loading_label.remove()
+        items = [ListItem(Label(season['name'])) for season in self.seasons]
+        self.season_list = ListView(*items, id="season-list")
+        self.mount(self.season_list)
+        self.mount(Label("Entrée: sélectionner la saison, q ou Échap : retour", id="anime-info-help"))
+        self.season_list.index = 0
+        self.set_focus(self.season_list)
+    def on_mount(self):
+        self.run_worker(self.load_seasons, thread=True, exit_on_error=False)
+    def on_list_view_selected(self, event):
+        if hasattr(self, "season_list") and event.control is self.season_list:
+            idx = self.season_list.index
+            if idx is not None and 0 <= idx < len(self.seasons):
+                season = self.seasons[idx]
+                season_url = self.anime_url.rstrip('/') + '/' + season['url'].lstrip('/')
+                self.app.push_screen(EpisodesScreen(self.anime_name, season['name'], season_url))
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+class SearchScreen(Screen):
+    def __init__(self, search_term=None):
+        super().__init__()
+        self.search_term = search_term
+        self.search_generation = 0
+        self.results_generation = 0
+        self.debounce_timer = None
+        self.typed_at = 0.0
+        self.focus_results = False
+    def compose(self) -> ComposeResult:
+        yield Label("Recherche d'anime :", id="search-title")
+        self.input = Input(placeholder="Tapez le nom de l'anime...", id="search-input")
+        yield self.input
+        self.result_label = Label("", id="search-result")
+        yield self.result_label
+        self.results_list = ListView(id="search-results-list")
+        yield self.results_list
+        self.animes = []
+        self.urls = []
+        yield Label("Entrée: valider, q ou Échap: retour menu", id="search-help")
+    def on_mount(self):
+        self.set_focus(self.input)
+        if self.search_term:
+            self.input.value = self.search_term
+            self.submit_search()
+
+    def on_input_changed(self, event: Input.Changed):
+        if event.input is not self.input:
+            return
+        self.typed_at = time.perf_counter()
+        self.focus_results = False
+        if self.debounce_timer:
+            self.debounce_timer.stop()
+        if len(event.value.strip()) < SEARCH_MIN_LENGTH:
+            self.search_generation += 1
+            self.show_results(self.search_generation, [], [], final=True)
+            return
+        self.debounce_timer = self.set_timer(SEARCH_DEBOUNCE, self.start_search)
+
+    def on_input_submitted(self, event: Input.Submitted):
+        self.typed_at = time.perf_counter()
+        self.submit_search()
+
+    def submit_search(self):
+        if self.debounce_timer:
+            self.debounce_timer.stop()
+        self.focus_results = True
+        self.start_search()
+
+    def start_search(self):
+        query = self.input.value.strip()
+        self.search_generation += 1
+        generation = self.search_generation
+        if not query:
+            self.show_results(generation, [], [], final=True)
+            return
+        self.result_label.update(f"Recherche de : {query} ...")
+        index = get_catalogue_index()
+        if index.is_fresh():
+            animes, urls = index.search(query)
+            if animes:
+                self.show_results(generation, animes, urls, final=False)
+        self.run_worker(
+            partial(self.network_search, query, generation),
+            thread=True, exclusive=True, group="search", exit_on_error=False
+        )
+
+    def network_search(self, query, generation):
+        animes, urls = AnimeDownloader().get_catalogue(query)
+        if get_current_worker().is_cancelled:
+            return
+        self.app.call_from_thread(self.merge_results, generation, animes, urls)
+
+    def merge_results(self, generation, animes, urls):
+        if generation != self.search_generation:
+            return
+        if self.results_generation != generation or not self.animes:
+            self.show_results(generation, animes, urls, final=True)
+            return
+        known = set(self.urls)
+        extra = [(anime, url) for anime, url in zip(animes, urls) if url not in known]
+        for anime, url in extra:
+            self.animes.append(anime)
+            self.urls.append(url)
+            self.results_list.append(ListItem(Label(anime)))
+        self.update_result_label(final=True)
+
+    def show_results(self, generation, animes, urls, final=False):
+        if generation != self.search_generation:
+            return
+        self.results_generation = generation
+        self.animes = list(animes)
+        self.urls = list(urls)
+        self.results_list.clear()
+        if not self.input.value.strip():
+            self.result_label.update("")
+            return
+        if not animes:
+            if final:
+                self.result_label.update("Aucun anime trouvé.")
+            return
+        self.results_list.extend(ListItem(Label(anime)) for anime in animes)
+        self.update_result_label(final)
+        if self.focus_results:
+            self.results_list.index = 0
+            self.set_focus(self.results_list)
+
+    def update_result_label(self, final):
+        elapsed = (time.perf_counter() - self.typed_at) * 1000
+        label = f"{len(self.animes)} résultat(s) trouvé(s) ({elapsed:.0f} ms)"
+        if final:
+            self.result_label.update(f"{label} :")
+        else:
+            self.result_label.update(f"{label}, recherche en ligne... :")
+
+    def on_list_view_selected(self, event):
+        if event.control is self.results_list:
+            idx = self.results_list.index
+            if idx is not None and 0 <= idx < len(self.animes):
+                anime_name = self.animes[idx]
+                anime_url = self.urls[idx]
+                self.app.push_screen(AnimeInfoScreen(anime_name, anime_url))
+
+    def key_q(self):
+        self.app.pop_screen()
+    def key_escape(self):
+        self.key_q()
+
+class AnimeSamaTUI(App):
+    CSS_PATH = None
+    BINDINGS = [
+        ("q", "quit", "Quitter"),
+        ("up", "up", "Monter"),
+        ("down", "down", "Descendre"),
+        ("enter", "enter", "Valider")
+    ]
+
+    def __init__(self, start_screen=None, search_term=None, pre_screen=None, history_sort="recent"):
+        super().__init__()
+        self.history_sort = history_sort
+        self.start_screen = start_screen
+        self.search_term = search_term
+        self.pre_screen = pre_screen
+
+    def compose(self) -> ComposeResult:
+        yield Header()
+        self.menu = MainMenu()
+        yield Container(self.menu, id="main-container")
+        yield Footer()
+
+    async def on_mount(self):
+        if self.pre_screen:
+            await self.push_screen(self.pre_screen)
+        elif self.search_term:
+            await self.push_screen(SearchScreen(search_term=self.search_term))
+        elif self.start_screen == "planning":
+            await self.push_screen(PlanningScreen())
+        elif self.start_screen == "history":
+            await self.push_screen(HistoryScreen(self.history_sort))
+        else:
+            self.set_focus(self.menu.list_view)
+
+    async def handle_menu_select(self, event: MenuSelect):
+        action = MENU_ITEMS[event.index][1]
+        if action == "search":
+            await self.action_search()
+        elif action == "history":
+            await self.action_history()
+        elif action == "planning":
+            await self.action_planning()
+        elif action == "upcoming":
+            await self.action_upcoming()
+        elif action == "downloads":
+            await self.action_downloads()
+
+    async def action_search(self):
+        await self.push_screen(SearchScreen())
+    async def action_history(self):
+        await self.push_screen(HistoryScreen(self.history_sort))
+    async def action_planning(self):
+        await self.push_screen(PlanningScreen())
+    async def action_upcoming(self):
+        await self.push_screen(UpcomingScreen())
+    async def action_downloads(self):
+        await self.push_screen(DownloadsScreen())
+
+    def on_unmount(self):
+        get_download_scheduler().cancel()
+
+    def on_menu_select(self, event: MenuSelect):
+        asyncio.create_task(self.handle_menu_select(event))
+
+def tui_main(args):
+    get_download_scheduler(args.jobs, args.limit_rate, args.segments)
+    start_screen = None
+    if args.planing:
+        start_screen = "planning"
+    elif args.continuer:
+        start_screen = "history"
+
+    if args.check_final:
+        app = AnimeSamaTUI(pre_screen=HistoryCheckFinalScreen(workers=args.workers))
+        app.run()
+    else:
+        search_term = " ".join(args.query) if args.query else None
+        app = AnimeSamaTUI(start_screen=start_screen, search_term=search_term, history_sort=args.sort)
+        app.run()
@@ -0,0 +1,42 @@
+var eps1 = [
+'https://video.sibnet.ru/shell.php?videoid=4871001',
+'https://video.sibnet.ru/shell.php?videoid=4871002',
+'https://video.sibnet.ru/shell.php?videoid=4871003',
+'https://video.sibnet.ru/shell.php?videoid=4871004',
+'https://video.sibnet.ru/shell.php?videoid=4871005',
+'https://video.sibnet.ru/shell.php?videoid=4871006',
+'https://video.sibnet.ru/shell.php?videoid=4871007',
+'https://video.sibnet.ru/shell.php?videoid=4871008',
+'https://video.sibnet.ru/shell.php?videoid=4871009',
+'https://video.sibnet.ru/shell.php?videoid=4871010',
+'https://video.sibnet.ru/shell.php?videoid=4871011',
+'https://video.sibnet.ru/shell.php?videoid=4871012',
+];
+var eps2 = [
+'https://sendvid.com/embed/q8x1k2a1',
+'https://sendvid.com/embed/q8x1k2a2',
+'https://sendvid.com/embed/q8x1k2a3',
+'https://sendvid.com/embed/q8x1k2a4',
+'https://sendvid.com/embed/q8x1k2a5',
+'https://sendvid.com/embed/q8x1k2a6',
+'https://sendvid.com/embed/q8x1k2a7',
+'https://sendvid.com/embed/q8x1k2a8',
+'https://sendvid.com/embed/q8x1k2a9',
+'https://sendvid.com/embed/q8x1k2b0',
+'https://sendvid.com/embed/q8x1k2b1',
+'https://sendvid.com/embed/q8x1k2b2',
+];
+var eps3 = [
+'https://vidmoly.to/embed-3kf9w0a1b2c1.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c2.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c3.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c4.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c5.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c6.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c7.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c8.html',
+'https://vidmoly.to/embed-3kf9w0a1b2c9.html',
+'https://vidmoly.to/embed-3kf9w0a1b2d0.html',
+'https://vidmoly.to/embed-3kf9w0a1b2d1.html',
+'https://vidmoly.to/embed-3kf9w0a1b2d2.html',
+];
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from run import SEASON_URL, install_stub, load_app
+from stub_server import StubServer, synthetic_episodes_js
+
+WATCHED_EPISODE = 10
+
+
+def seed_history(app):
+    with app.get_db().transaction() as conn:
+        conn.execute("DELETE FROM history")
+        conn.execute(
+            "INSERT INTO history (anime_name, episode, saison, url) VALUES (?, ?, ?, ?)",
+            ("Naruto Shippuden", f"Episode {WATCHED_EPISODE}", "Saison 1 - VOSTFR", SEASON_URL)
+        )
+
+
+def expire_seasons(app):
+    app.get_db().execute("UPDATE seasons SET checked_at = 0")
+
+
+def new_episodes(app):
+    checked = [entry for _, entry in app.revalidate_history(app.get_history_entries())]
+    return app.history_new_episodes(checked[0])
+
+
+def publish_episode(server, count):
+    server.bodies["season"] = server.bodies["season"].replace(b"filever=3041", b"filever=3042")
+    server.bodies["episodes"] = synthetic_episodes_js(count)
+
+
+def run_checks(app, server):
+    seed_history(app)
+    checks = [("premier passage", new_episodes(app), 2)]
+    expire_seasons(app)
+    server.reset()
+    checks.append(("page inchangée", new_episodes(app), 2))
+    revalidated = any(path.endswith("/saison1/vostfr") for path in server.requests)
+    checks.append(("page de saison revalidée", revalidated, True))
+    publish_episode(server, 13)
+    expire_seasons(app)
+    checks.append(("nouveau filever", new_episodes(app), 3))
+    return checks
+
+
+def main():
+    with tempfile.TemporaryDirectory() as home:
+        app = load_app(home)
+        server = StubServer().start()
+        try:
+            install_stub(app, server.base_url)
+            checks = run_checks(app, server)
+        finally:
+            server.stop()
+    failed = False
+    for name, got, expected in checks:
+        ok = got == expected
+        failed |= not ok
+        print(f"{name:<28} attendu {expected!s:<6} obtenu {got!s:<6} {'ok' if ok else 'ÉCHEC'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
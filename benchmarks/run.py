@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+
+import argparse
+import builtins
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(1, ROOT_DIR)
+
+from stub_server import StubServer
+
+STUB_HOSTS = ("anime-sama.fr", "video.sibnet.ru", "sendvid.com", "vidmoly.to", "animecountdown.com")
+SEASON_URL = "https://anime-sama.fr/catalogue/naruto-shippuden/saison1/vostfr"
+LARGE_SEASON_URL = "https://anime-sama.fr/catalogue/large/saison1/vostfr"
+HISTORY_ROWS = 500
+SIBNET_LINK = re.compile(r'https://video\.sibnet\.ru/shell\.php\?videoid=(\d+)')
+
+
+def load_app(home):
+    os.environ["HOME"] = home
+    spec = importlib.util.spec_from_file_location("anime_sama", os.path.join(ROOT_DIR, "anime_sama.py"))
+    app = importlib.util.module_from_spec(spec)
+    sys.modules["anime_sama"] = app
+    spec.loader.exec_module(app)
+    return app
+
+
+def install_stub(app, base_url):
+    from anime_sama_http import PooledAdapter
+
+    class StubAdapter(PooledAdapter):
+        def _network_send(self, request, **kwargs):
+            parts = urlsplit(request.url)
+            if parts.hostname in STUB_HOSTS:
+                query = f"?{parts.query}" if parts.query else ""
+                request = request.copy()
+                request.url = f"{base_url}/{parts.hostname}{parts.path}{query}"
+            return super()._network_send(request, **kwargs)
+
+    client = app.get_client()
+    adapter = StubAdapter(pool_connections=app.HTTP_POOL_SIZE, pool_maxsize=app.HTTP_POOL_SIZE)
+    client.session.mount("https://", adapter)
+    client.session.mount("http://", adapter)
+
+
+def install_fake_mpv(bin_dir):
+    path = os.path.join(bin_dir, "mpv")
+    with open(path, "w") as f:
+        f.write("#!/bin/sh\nexit 0\n")
+    os.chmod(path, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def reset_local_state(app):
+    with app.get_db().transaction() as conn:
+        for table in ("show_seasons", "seasons", "season_episodes", "catalogue_meta"):
+            conn.execute(f"DELETE FROM {table}")
+
+
+@contextlib.contextmanager
+def scripted_input(answers):
+    answers = list(answers)
+    original = builtins.input
+    builtins.input = lambda prompt="": answers.pop(0) if answers else "0"
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+def measure(name, fn, repeat, setup=None):
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            fn()
+            durations.append(time.perf_counter() - started)
+    return {
+        "name": name,
+        "runs": repeat,
+        "min_ms": min(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "mean_ms": statistics.fmean(durations) * 1000,
+    }
+
+
+def run_pipeline(app):
+    with scripted_input(["1", "1", "1", "n"]):
+        sys.argv = ["anime", "--cli", "naruto"]
+        app.main()
+
+
+def seed_history(app):
+    with app.get_db().transaction() as conn:
+        conn.execute("DELETE FROM history")
+        conn.executemany(
+            "INSERT INTO history (anime_name, episode, saison, url) VALUES (?, ?, ?, ?)",
+            [(f"Anime {i}", "Episode 12", "Saison 1 - VOSTFR",
+              f"https://anime-sama.fr/catalogue/anime-{i}/saison1/vostfr") for i in range(HISTORY_ROWS)]
+        )
+
+
+def race_mirrors(app):
+    mirrors = app.episode_table(app.parse_episodes_js(read_episodes_fixture()))["1"]
+    candidates = [(player, app.hoster_name(url), url) for player, url in mirrors.items()]
+    return app.get_mirror_racer().race(candidates)
+
+
+def read_episodes_fixture():
+    with open(os.path.join(BENCH_DIR, "fixtures", "episodes.js")) as f:
+        return f.read()
+
+
+def run_benchmarks(app, server, repeat):
+    downloader = app.AnimeDownloader()
+    season_page = server.bodies["season"].decode()
+    large_catalogue = server.bodies["catalogue-large"].decode()
+    large_episodes = server.bodies["episodes-large"].decode()
+    upcoming_page = server.bodies["upcoming"].decode()
+    results = [
+        measure("get_catalogue", lambda: downloader.get_catalogue("naruto"), repeat),
+        measure("get_seasons (fetch + parse)",
+                lambda: app.get_seasons(app.get_client().get("https://anime-sama.fr/catalogue/naruto-shippuden/").text),
+                repeat),
+        measure("get_episode_list", lambda: app.get_episode_list(SEASON_URL), repeat),
+        measure("get_anime_episode", lambda: downloader.get_anime_episode(SEASON_URL, "3041"), repeat),
+        measure("get_video_url", lambda: downloader.get_video_url("4871001"), repeat),
+        measure("course des lecteurs (sibnet, sendvid, vidmoly)", lambda: race_mirrors(app), repeat),
+        measure("pipeline search -> play (mpv factice)", lambda: run_pipeline(app), repeat,
+                setup=lambda: reset_local_state(app)),
+        measure("get_anime_episode (5000 épisodes)",
+                lambda: downloader.get_anime_episode(LARGE_SEASON_URL, "1"), repeat),
+        measure("parse_episodes_js (5000 épisodes x 3 lecteurs)",
+                lambda: app.episode_table(app.parse_episodes_js(large_episodes)), repeat),
+        measure("regex sibnet seule, référence (5000 x 3)",
+                lambda: {str(i): m.group(1) for i, m in enumerate(SIBNET_LINK.finditer(large_episodes), 1)}, repeat),
+        measure("get_catalogue (3000 cartes)", lambda: downloader.get_catalogue("large"), repeat),
+        measure("parse_catalogue_cards (3000 cartes)", lambda: app.parse_catalogue_cards(large_catalogue), repeat),
+        measure("get_seasons (parse seul)", lambda: app.get_seasons(season_page), repeat),
+        measure("parse_upcoming", lambda: app.parse_upcoming(upcoming_page), repeat),
+    ]
+    seed_history(app)
+    results.append(measure(f"get_history_entries ({HISTORY_ROWS} lignes)", app.get_history_entries, repeat))
+    results.append(measure(f"get_history_page ({HISTORY_ROWS} lignes, 1re page)", app.get_history_page, repeat))
+    results.append(measure(f"get_history_page ({HISTORY_ROWS} lignes, filtre)",
+                           lambda: app.get_history_page(text="anime 4"), repeat))
+    with scripted_input(["0"] * repeat):
+        results.append(measure(f"display_history -f ({HISTORY_ROWS} lignes)",
+                               lambda: app.display_history(full_check=True), repeat,
+                               setup=lambda: reset_local_state(app)))
+    return results
+
+
+def print_results(results, server, args):
+    print(f"Latence simulée : {args.latency:.0f} ms, débit : "
+          f"{f'{args.bandwidth} Kio/s' if args.bandwidth else 'illimité'}, cache : "
+          f"{'activé' if args.cache else 'désactivé'}, parseur : {args.parser}")
+    width = max(len(result["name"]) for result in results)
+    print(f"{'Benchmark'.ljust(width)}  {'min':>10}  {'médiane':>10}  {'moyenne':>10}")
+    for result in results:
+        print(f"{result['name'].ljust(width)}  {result['min_ms']:>8.1f}ms  "
+              f"{result['median_ms']:>8.1f}ms  {result['mean_ms']:>8.1f}ms")
+    print(f"Requêtes servies par le serveur local : {len(server.requests)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks anime-sama CLI contre un serveur local factice")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Nombre de répétitions par benchmark")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence ajoutée à chaque requête (ms)")
+    parser.add_argument("--bandwidth", type=int, default=0, help="Débit maximal par réponse (Kio/s, 0 = illimité)")
+    parser.add_argument("--cache", action="store_true", help="Laisser le cache HTTP actif")
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        app = load_app(home)
+        bin_dir = os.path.join(home, "bin")
+        os.makedirs(bin_dir)
+        install_fake_mpv(bin_dir)
+        if not args.cache:
+            app.set_cache_mode("off")
+        server = StubServer(latency=args.latency / 1000, bandwidth=args.bandwidth * 1024).start()
+        try:
+            install_stub(app, server.base_url)
+            args.parser = app.HTML_PARSER_BACKEND
+            results = run_benchmarks(app, server, args.repeat)
+        finally:
+            server.stop()
+        print_results(results, server, args)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({"settings": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
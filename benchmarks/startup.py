@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+SCRIPT = os.path.join(ROOT_DIR, "anime-sama.py")
+
+IMPORT_BUDGET_MS = 60
+WALL_BUDGET_MS = 100
+FORBIDDEN_MODULES = ("requests", "urllib3", "bs4", "lxml", "selectolax", "textual", "rich", "anime_sama_http", "anime_sama_tui")
+COMMANDS = {
+    "anime -h": ["-h"],
+    "anime --cli -c": ["--cli", "-c"],
+}
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run(args, home, importtime=False):
+    env = dict(os.environ, HOME=home)
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [SCRIPT] + args
+    started = time.perf_counter()
+    result = subprocess.run(command, input="0\n", capture_output=True, text=True, env=env)
+    return time.perf_counter() - started, result.stderr
+
+
+def parse_importtime(stderr):
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return modules
+
+
+def measure(name, args, home, repeat):
+    baseline = statistics.median(run_baseline() for _ in range(repeat))
+    walls = [run(args, home)[0] for _ in range(repeat)]
+    imports = [parse_importtime(run(args, home, importtime=True)[1]) for _ in range(repeat)]
+    modules = imports[-1]
+    return {
+        "name": name,
+        "wall_ms": statistics.median(walls) * 1000,
+        "interpreter_ms": baseline * 1000,
+        "import_ms": statistics.median(timings.get("anime_sama", 0.0) for timings in imports),
+        "forbidden": sorted(module for module in modules if module.split(".")[0] in FORBIDDEN_MODULES),
+    }
+
+
+def run_baseline():
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget de démarrage de anime-sama (python -X importtime)")
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="Nombre de lancements par commande")
+    parser.add_argument("--json", help="Écrire les résultats dans ce fichier JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        results = [measure(name, command, home, args.repeat) for name, command in COMMANDS.items()]
+
+    failed = False
+    print(f"Budget : import de anime_sama < {IMPORT_BUDGET_MS} ms, "
+          f"lancement < {WALL_BUDGET_MS} ms au-delà de l'interpréteur nu")
+    for result in results:
+        overhead = result["wall_ms"] - result["interpreter_ms"]
+        ok = (result["import_ms"] < IMPORT_BUDGET_MS and overhead < WALL_BUDGET_MS
+              and not result["forbidden"])
+        failed |= not ok
+        print(f"{result['name']:<16} import {result['import_ms']:>6.1f}ms  lancement {result['wall_ms']:>6.1f}ms "
+              f"(interpréteur {result['interpreter_ms']:.1f}ms)  {'ok' if ok else 'HORS BUDGET'}")
+        if result["forbidden"]:
+            print(f"  modules chargés inutilement : {', '.join(result['forbidden'])}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"import_budget_ms": IMPORT_BUDGET_MS, "wall_budget_ms": WALL_BUDGET_MS,
+                       "results": results}, f, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+VIDEO_BYTES = 2 * 1024 * 1024
+
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), "rb") as f:
+        return f.read()
+
+
+def synthetic_episodes_js(count):
+    players = [
+        lambda i: f"https://video.sibnet.ru/shell.php?videoid={5000000 + i}" if i % 7 else "",
+        lambda i: f"https://sendvid.com/embed/{i:08x}",
+        lambda i: f"https://vidmoly.to/embed-{i:012x}.html" if i % 3 else "",
+    ]
+    lines = []
+    for number, player in enumerate(players, 1):
+        lines.append(f"var eps{number} = [")
+        lines += [f"'{player(i)}'," for i in range(1, count + 1)]
+        lines.append("];")
+    return "\n".join(lines).encode()
+
+
+def empty_catalogue():
+    page = read_fixture("catalogue.html").decode()
+    return re.sub(r'(<div id="list_catalog"[^>]*>).*?(</div>\s*<footer>)', r'\1\2', page, flags=re.S).encode()
+
+
+def synthetic_catalogue(count):
+    card = (
+        '<div class="shrink-0 catalog-card card-base"><a href="https://anime-sama.fr/catalogue/anime-{i}/">'
+        '<img class="imageCarteHorizontale" src="https://cdn.example/{i}.jpg" alt="Anime {i}">'
+        '<div class="card-text"><h1 class="text-white font-bold uppercase text-md line-clamp-2">Anime {i}</h1>'
+        '<p class="text-white text-xs opacity-40 truncate italic">Titre alternatif {i}</p>'
+        '<p class="text-white text-xs font-medium">Action, Aventure</p>'
+        '<p class="text-white text-xs font-semibold">VOSTFR, VF</p></div></a></div>'
+    )
+    cards = "".join(card.format(i=i) for i in range(count))
+    page = read_fixture("catalogue.html").decode()
+    return page.replace('<div id="list_catalog" class="grid grid-cols-2 gap-3">',
+                        '<div id="list_catalog" class="grid grid-cols-2 gap-3">' + cards, 1).encode()
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class StubServer:
+    def __init__(self, latency=0.0, bandwidth=0, host_latency=None):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.host_latency = host_latency or {}
+        self.requests = []
+        self.lock = threading.Lock()
+        self.bodies = {
+            "catalogue": read_fixture("catalogue.html"),
+            "catalogue-large": synthetic_catalogue(3000),
+            "catalogue-empty": empty_catalogue(),
+            "season": read_fixture("season.html"),
+            "episodes": read_fixture("episodes.js"),
+            "episodes-large": synthetic_episodes_js(5000),
+            "shell": read_fixture("sibnet_shell.html"),
+            "planning": read_fixture("planning.html"),
+            "upcoming": read_fixture("upcoming.html"),
+            "video": os.urandom(64 * 1024) * (VIDEO_BYTES // (64 * 1024)),
+        }
+        self.last_modified = formatdate(usegmt=True)
+        self.httpd = QuietHTTPServer(("127.0.0.1", 0), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def reset(self):
+        with self.lock:
+            self.requests = []
+
+    def not_modified(self, request_headers, headers):
+        etag = request_headers.get("If-None-Match")
+        if etag is not None:
+            return etag == headers["ETag"]
+        return request_headers.get("If-Modified-Since") == headers["Last-Modified"]
+
+    def route(self, path, query):
+        host, _, rest = path.lstrip("/").partition("/")
+        rest = "/" + rest
+        if host == "anime-sama.fr":
+            if rest.rstrip("/") == "/planning":
+                return 200, "text/html; charset=utf-8", self.bodies["planning"], {}
+            if rest.rstrip("/") == "/catalogue":
+                page = query.get("page", [None])[0]
+                if page and page != "1":
+                    key = "catalogue-empty"
+                elif page or query.get("search", [""])[0] == "large":
+                    key = "catalogue-large"
+                else:
+                    key = "catalogue"
+                return 200, "text/html; charset=utf-8", self.bodies[key], {}
+            if rest.endswith("/episodes.js"):
+                key = "episodes-large" if "/large/" in rest else "episodes"
+                return 200, "application/javascript", self.bodies[key], {}
+            if rest.startswith("/catalogue/"):
+                return 200, "text/html; charset=utf-8", self.bodies["season"], {}
+        if host == "animecountdown.com" and rest.rstrip("/") == "/upcoming":
+            return 200, "text/html; charset=utf-8", self.bodies["upcoming"], {}
+        if host == "video.sibnet.ru":
+            if rest == "/shell.php":
+                video_id = query.get("videoid", ["0"])[0]
+                body = self.bodies["shell"].replace(b"4871001", video_id.encode())
+                return 200, "text/html; charset=utf-8", body, {}
+            match = re.match(r"/v/[^/]+/(\d+)\.mp4$", rest)
+            if match:
+                return 302, "text/plain", b"", {"Location": f"{self.base_url}/cdn/{match.group(1)}.mp4"}
+        if host == "sendvid.com" and rest.startswith("/embed/"):
+            video = rest.rsplit("/", 1)[1]
+            body = (f'<video id="video-js"><source src="{self.base_url}/cdn/sv-{video}.mp4" '
+                    f'type="video/mp4"></video>').encode()
+            return 200, "text/html; charset=utf-8", body, {}
+        if host == "vidmoly.to" and rest.startswith("/embed-"):
+            video = rest[len("/embed-"):].split(".")[0]
+            body = f'<script>player.setup({{sources: [{{file:"{self.base_url}/hls/{video}/master.m3u8"}}]}});</script>'
+            return 200, "text/html; charset=utf-8", body.encode(), {}
+        if host == "hls":
+            if rest.endswith("/master.m3u8"):
+                body = b"#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\nindex.m3u8\n"
+            else:
+                body = b"#EXTM3U\n#EXT-X-TARGETDURATION:10\n#EXTINF:10,\n/cdn/segment0.ts\n#EXT-X-ENDLIST\n"
+            return 200, "application/vnd.apple.mpegurl", body, {}
+        if host == "cdn":
+            return 200, "video/mp4", self.bodies["video"], {"Accept-Ranges": "bytes"}
+        return 404, "text/plain", b"not found", {}
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                with server.lock:
+                    server.requests.append(self.path)
+                delay = server.latency + server.host_latency.get(parts.path.lstrip("/").split("/", 1)[0], 0)
+                if delay:
+                    time.sleep(delay)
+                status, content_type, body, headers = server.route(parts.path, parse_qs(parts.query))
+                range_header = self.headers.get("Range")
+                if status == 200 and range_header and headers.get("Accept-Ranges") == "bytes":
+                    start, _, end = range_header.replace("bytes=", "").partition("-")
+                    start = int(start or 0)
+                    end = min(int(end) if end else len(body) - 1, len(body) - 1)
+                    headers = dict(headers, **{"Content-Range": f"bytes {start}-{end}/{len(body)}"})
+                    body = body[start:end + 1]
+                    status = 206
+                elif status == 200 and "Accept-Ranges" not in headers:
+                    headers = dict(headers, **{"ETag": f'"{zlib.crc32(body):08x}"',
+                                               "Last-Modified": server.last_modified})
+                    if server.not_modified(self.headers, headers):
+                        status, body = 304, b""
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.write_body(body)
+
+            def write_body(self, body):
+                if not server.bandwidth:
+                    self.wfile.write(body)
+                    return
+                chunk = max(1024, server.bandwidth // 20)
+                for offset in range(0, len(body), chunk):
+                    self.wfile.write(body[offset:offset + chunk])
+                    time.sleep(len(body[offset:offset + chunk]) / server.bandwidth)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -91,6 +91,19 @@ sudo chmod +x /usr/local/bin/animesama-cli
 echo "Création du répertoire pour la base de données..."
 mkdir -p "$HOME/.local/share/animesama-cli"
 
+# Proposer le rafraîchissement en arrière-plan (service systemd utilisateur)
+if command -v systemctl > /dev/null; then
+    read -p "Voulez-vous garder l'historique et le planning à jour en arrière-plan ? (o/n) " install_daemon
+    if [[ $install_daemon == "o" || $install_daemon == "O" || $install_daemon == "oui" ]]; then
+        mkdir -p "$HOME/.config/systemd/user"
+        sed "s#/usr/bin/animesama-cli#/usr/local/bin/animesama-cli#" "$HOME/animesama-cli/animesama-cli.service" \
+            > "$HOME/.config/systemd/user/animesama-cli.service"
+        systemctl --user daemon-reload
+        systemctl --user enable --now animesama-cli.service
+        echo "Service animesama-cli activé."
+    fi
+fi
+
 echo -e "\nInstallation terminée !"
 echo "Vous pouvez maintenant lancer l'application en tapant simplement:"
 echo "  animesama-cli" 